@@ -4,86 +4,155 @@ Add latitude/longitude coordinates to NZ job locations.
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
+import os
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, MutableMapping, Optional, Set, Tuple
 
 import pandas as pd
+from geopy.exc import GeopyError
 from geopy.extra.rate_limiter import RateLimiter
 from geopy.geocoders import Nominatim
 
+from async_geocoder import DEFAULT_BASE_URL, AsyncGeocoder, GeocodeError
+from columnar_io import FrameWriter, append_frame, iter_frames, read_columns, read_frame, write_frame
+from gazetteer import DEFAULT_PLACES, Gazetteer, build_gazetteer
+from geocode_cache import DEFAULT_NEGATIVE_TTL_SECONDS, SqliteGeocodeCache, is_sqlite_cache
+from location_normalizer import geocode_name, normalize_series
+from metro_assigner import MetroIndex
+
 
 DEFAULT_INPUT = "nz_jobs_data.csv"
 DEFAULT_OUTPUT = "nz_jobs_data_with_coords.csv"
 DEFAULT_CACHE = "geocode_cache.json"
 
-
-MANUAL_LOCATION_MAP = {
-    "Auckland CBD": "Auckland",
-    "Wellington Central": "Wellington",
-    "Christchurch Central": "Christchurch",
-    "Palmerston North Central": "Palmerston North",
-    "Taupo Central": "Taupo",
-    "Mount Eden": "Auckland",
-    "North Dunedin": "Dunedin",
-}
+METRO_INDEX = MetroIndex()
 
 
 def normalize_location(raw_value: str) -> str:
-    value = raw_value.strip()
-    if value in MANUAL_LOCATION_MAP:
-        return MANUAL_LOCATION_MAP[value]
-
-    lower_value = value.lower()
-    if "auckland" in lower_value:
-        return "Auckland"
-    if "wellington" in lower_value:
-        return "Wellington"
-    if "christchurch" in lower_value:
-        return "Christchurch"
-    if "dunedin" in lower_value:
-        return "Dunedin"
-
-    return value
-
-
-def pick_location(row: pd.Series) -> Optional[str]:
-    for col in ("location", "city", "region"):
-        raw = row.get(col)
-        if isinstance(raw, str) and raw.strip():
-            return raw.strip()
-    return None
+    return geocode_name(raw_value)
+
+
+LOCATION_COLUMNS = ("location", "city", "region")
+
+
+def coalesce_locations(df: pd.DataFrame) -> pd.Series:
+    """First non-blank of location, city, region per row."""
+    result = pd.Series(None, index=df.index, dtype="object")
+    for col in LOCATION_COLUMNS:
+        if col not in df or not pd.api.types.is_object_dtype(df[col]) and not pd.api.types.is_string_dtype(df[col]):
+            continue
+        stripped = df[col].str.strip()
+        stripped = stripped.where(stripped.str.len() > 0)
+        result = result.where(result.notna(), stripped)
+    return result
+
+
+def normalize_locations(raw_locations: pd.Series) -> pd.Categorical:
+    """normalize_location applied once per distinct value, returned as categorical codes."""
+    return normalize_series(raw_locations, geocode_name)
+
 
+def attach_coordinates(
+    df: pd.DataFrame,
+    normalized: pd.Categorical,
+    coords_lookup: Dict[str, Dict[str, Optional[float]]],
+) -> None:
+    """Join latitude/longitude (and the nearest metro) through the category codes."""
+    table = pd.DataFrame.from_dict(
+        coords_lookup, orient="index", columns=["latitude", "longitude"]
+    ).reindex(normalized.categories)
+    codes = normalized.codes
+    latitude = table["latitude"].to_numpy(dtype="float64")
+    longitude = table["longitude"].to_numpy(dtype="float64")
+    df["latitude"] = latitude[codes]
+    df["longitude"] = longitude[codes]
+    metro_names, _ = METRO_INDEX.assign(latitude, longitude)
+    df["metro_city"] = metro_names[codes]
+
+
+def load_cache(
+    cache_path: Path,
+    import_json_path: Optional[Path] = None,
+    negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+) -> MutableMapping[str, Dict[str, float]]:
+    if is_sqlite_cache(cache_path):
+        cache = SqliteGeocodeCache(cache_path, negative_ttl_seconds=negative_ttl_seconds)
+        if import_json_path is not None:
+            imported = cache.import_json(import_json_path)
+            if imported:
+                print(f"Imported {imported} cached locations from {import_json_path}")
+        return cache
 
-def load_cache(cache_path: Path) -> Dict[str, Dict[str, float]]:
     if not cache_path.exists():
         return {}
     with cache_path.open("r", encoding="utf-8") as handle:
         return json.load(handle)
 
 
-def save_cache(cache_path: Path, cache: Dict[str, Dict[str, float]]) -> None:
+def save_cache(cache_path: Path, cache: MutableMapping[str, Dict[str, float]]) -> None:
+    if isinstance(cache, SqliteGeocodeCache):
+        cache.commit()
+        return
     with cache_path.open("w", encoding="utf-8") as handle:
         json.dump(cache, handle, ensure_ascii=True, indent=2)
 
 
-def geocode_location(
-    geocode_fn,
+def resolve_offline(
     location: str,
-    cache: Dict[str, Dict[str, float]],
-) -> Dict[str, Optional[float]]:
-    if location in cache:
-        cached = cache[location]
+    cache: MutableMapping[str, Dict[str, float]],
+    gazetteer: Optional[Gazetteer],
+    stats: Dict[str, int],
+) -> Optional[Dict[str, Optional[float]]]:
+    """Resolve from the cache or gazetteer; None means a network lookup is needed."""
+    cached = cache.get(location)
+    if cached is not None and cached["latitude"] is not None:
+        stats["cache"] = stats.get("cache", 0) + 1
         return {"latitude": cached["latitude"], "longitude": cached["longitude"]}
 
-    queries = [
+    if gazetteer is not None:
+        local = gazetteer.lookup(location)
+        if local is not None:
+            stats["gazetteer"] = stats.get("gazetteer", 0) + 1
+            return local
+
+    # Known network miss that the gazetteer cannot resolve either
+    if cached is not None:
+        stats["cache"] = stats.get("cache", 0) + 1
+        return {"latitude": None, "longitude": None}
+
+    stats["network"] = stats.get("network", 0) + 1
+    return None
+
+
+def geocode_queries(location: str) -> List[str]:
+    return [
         f"{location}, New Zealand",
         f"{location} New Zealand",
     ]
 
+
+def geocode_location(
+    geocode_fn,
+    location: str,
+    cache: MutableMapping[str, Dict[str, float]],
+    gazetteer: Optional[Gazetteer] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Dict[str, Optional[float]]:
+    offline = resolve_offline(location, cache, gazetteer, stats if stats is not None else {})
+    if offline is not None:
+        return offline
+
     result = None
-    for query in queries:
-        result = geocode_fn(query)
+    for query in geocode_queries(location):
+        try:
+            result = geocode_fn(query)
+        except GeopyError as exc:
+            # Failed lookup, not a miss: leave it uncached so a later run retries
+            print(f"Geocoding failed for {location}: {exc}")
+            return {"latitude": None, "longitude": None}
         if result is not None:
             break
 
@@ -95,50 +164,325 @@ def geocode_location(
     return {"latitude": result.latitude, "longitude": result.longitude}
 
 
+async def geocode_locations_async(
+    geocoder: AsyncGeocoder,
+    locations: List[str],
+    cache: MutableMapping[str, Dict[str, float]],
+    gazetteer: Optional[Gazetteer] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    stats = stats if stats is not None else {}
+    coords_lookup: Dict[str, Dict[str, Optional[float]]] = {}
+    misses = []
+    for location in locations:
+        offline = resolve_offline(location, cache, gazetteer, stats)
+        if offline is None:
+            misses.append(location)
+        else:
+            coords_lookup[location] = offline
+
+    async def _lookup(location: str) -> None:
+        result = None
+        for query in geocode_queries(location):
+            try:
+                result = await geocoder.geocode(query)
+            except GeocodeError as exc:
+                # Failed lookup, not a miss: leave it uncached so a later run retries
+                print(f"Geocoding failed for {location}: {exc}")
+                coords_lookup[location] = {"latitude": None, "longitude": None}
+                return
+            if result is not None:
+                break
+        coords = {"latitude": None, "longitude": None}
+        if result is not None:
+            coords = {"latitude": result[0], "longitude": result[1]}
+        # Cache writes stay on the event loop thread
+        cache[location] = coords
+        coords_lookup[location] = coords
+
+    await asyncio.gather(*(_lookup(location) for location in misses))
+    return coords_lookup
+
+
+def resolve_coordinates(
+    unique_locations: List[str],
+    cache_path: Path,
+    min_delay_seconds: float,
+    import_json_path: Optional[Path] = None,
+    negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+    places_path: Optional[Path] = None,
+    use_gazetteer: bool = True,
+    geocoder_url: Optional[str] = None,
+    geocode_concurrency: int = 1,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    cache = load_cache(cache_path, import_json_path, negative_ttl_seconds)
+    gazetteer = build_gazetteer(places_path, cache) if use_gazetteer else None
+
+    stats: Dict[str, int] = {}
+    if geocode_concurrency > 1 or geocoder_url:
+        geocoder = AsyncGeocoder(
+            base_url=geocoder_url or DEFAULT_BASE_URL,
+            concurrency=geocode_concurrency,
+            min_delay_seconds=min_delay_seconds,
+        )
+        coords_lookup = asyncio.run(
+            geocode_locations_async(geocoder, unique_locations, cache, gazetteer, stats)
+        )
+        print(f"Geocoder requests: {geocoder.requests}, failed queries: {geocoder.failures}")
+    else:
+        geolocator = Nominatim(user_agent="nz_it_jobs_heatmap")
+        geocode_fn = RateLimiter(
+            geolocator.geocode,
+            min_delay_seconds=min_delay_seconds,
+            max_retries=2,
+            error_wait_seconds=min_delay_seconds,
+            swallow_exceptions=False,
+        )
+        coords_lookup = {}
+        for location in unique_locations:
+            coords_lookup[location] = geocode_location(geocode_fn, location, cache, gazetteer, stats)
+    print(
+        f"Resolved {len(unique_locations)} locations: "
+        f"{stats.get('cache', 0)} cached, {stats.get('gazetteer', 0)} offline, "
+        f"{stats.get('network', 0)} geocoded"
+    )
+
+    save_cache(cache_path, cache)
+    if isinstance(cache, SqliteGeocodeCache):
+        cache.close()
+    return coords_lookup
+
+
+def collect_locations(input_path: Path, chunksize: int) -> List[str]:
+    """First pass of chunked mode: distinct normalized locations, reading only the location columns."""
+    locations = set()
+    for chunk in iter_frames(input_path, chunksize, columns=LOCATION_COLUMNS):
+        locations.update(normalize_locations(coalesce_locations(chunk)).categories)
+    return sorted(loc for loc in locations if loc)
+
+
+def annotate_chunks(
+    input_path: Path,
+    output_path: Path,
+    coords_lookup: Dict[str, Dict[str, Optional[float]]],
+    chunksize: int,
+) -> int:
+    """Second pass of chunked mode: annotate and append one chunk at a time."""
+    rows = 0
+    # CSV columns are read as text so each chunk writes the same way,
+    # whatever pandas would have inferred from that chunk alone.
+    with FrameWriter(output_path) as writer:
+        for chunk in iter_frames(input_path, chunksize):
+            chunk["raw_location"] = coalesce_locations(chunk)
+            normalized = normalize_locations(chunk["raw_location"])
+            chunk["normalized_location"] = normalized
+            attach_coordinates(chunk, normalized, coords_lookup)
+            writer.write(chunk)
+            rows += len(chunk)
+    return rows
+
+
+ROW_HASH_COLUMNS = ("url", "title", "company", "location", "description", "posted_date")
+
+
+def row_keys(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """"id:<job_id>" where there is one, otherwise "h:<hash of the row's text>"."""
+    # Hash identifying text columns only: numeric columns may have been
+    # written back as floats ("100000.0") by a non-chunked run.
+    hash_columns = [col for col in ROW_HASH_COLUMNS if col in columns] or columns
+    hashed = pd.util.hash_pandas_object(df.reindex(columns=hash_columns), index=False)
+    keys = "h:" + hashed.astype(str)
+    if "job_id" in df:
+        job_ids = df["job_id"].str.strip().str.replace(r"\.0$", "", regex=True)
+        keys = keys.where(job_ids.isna() | (job_ids == ""), "id:" + job_ids)
+    return keys
+
+
+def _manifest_paths(output_path: Path) -> Tuple[Path, Path]:
+    return (
+        output_path.with_name(output_path.name + ".manifest.json"),
+        output_path.with_name(output_path.name + ".keys"),
+    )
+
+
+def load_processed_keys(
+    keys_path: Path,
+    output_path: Path,
+    columns: List[str],
+    chunksize: int,
+) -> Set[str]:
+    if keys_path.exists():
+        with keys_path.open("r", encoding="utf-8") as handle:
+            return {line.rstrip("\n") for line in handle if line.strip()}
+
+    # No manifest yet: index the rows an earlier full run already wrote
+    keys: Set[str] = set()
+    if output_path.exists():
+        for chunk in iter_frames(output_path, chunksize):
+            keys.update(row_keys(chunk, columns))
+        with keys_path.open("w", encoding="utf-8") as handle:
+            handle.writelines(f"{key}\n" for key in keys)
+    return keys
+
+
+def add_coordinates_incremental(
+    input_path: Path,
+    output_path: Path,
+    chunksize: int,
+    **geocode_options,
+) -> int:
+    """Annotate and append only the input rows that are not in the output yet."""
+    manifest_path, keys_path = _manifest_paths(output_path)
+    columns = read_columns(input_path)
+    processed = load_processed_keys(keys_path, output_path, columns, chunksize)
+
+    already_processed = len(processed)
+    new_parts = []
+    new_keys: List[str] = []
+    for chunk in iter_frames(input_path, chunksize):
+        keys = row_keys(chunk, columns)
+        is_new = ~keys.isin(processed) & ~keys.duplicated()
+        if is_new.any():
+            new_parts.append(chunk[is_new])
+            new_keys.extend(keys[is_new])
+            processed.update(keys[is_new])
+
+    rows = sum(len(part) for part in new_parts)
+    print(f"{rows} new rows ({already_processed} already processed)")
+    if rows:
+        delta = pd.concat(new_parts, ignore_index=True)
+        delta["raw_location"] = coalesce_locations(delta)
+        normalized = normalize_locations(delta["raw_location"])
+        delta["normalized_location"] = normalized
+        unique_locations = sorted(loc for loc in normalized.categories if loc)
+        attach_coordinates(delta, normalized, resolve_coordinates(unique_locations, **geocode_options))
+
+        if output_path.exists():
+            header = read_columns(output_path)
+            dropped = [col for col in delta.columns if col not in header]
+            if dropped:
+                print(f"Warning: columns not in {output_path} are dropped: {', '.join(dropped)}")
+            delta = delta.reindex(columns=header)
+        append_frame(delta, output_path)
+        with keys_path.open("a", encoding="utf-8") as handle:
+            handle.writelines(f"{key}\n" for key in new_keys)
+
+    manifest = {}
+    if manifest_path.exists():
+        with manifest_path.open("r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    runs = manifest.get("runs", [])[-19:] + [
+        {"at": datetime.now().isoformat(timespec="seconds"), "input": str(input_path), "new_rows": rows}
+    ]
+    manifest = {"output": str(output_path), "keys": keys_path.name, "rows": len(processed), "runs": runs}
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return rows
+
+
 def add_coordinates(
     input_path: Path,
     output_path: Path,
     cache_path: Path,
     min_delay_seconds: float,
+    import_json_path: Optional[Path] = None,
+    negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+    places_path: Optional[Path] = None,
+    use_gazetteer: bool = True,
+    geocoder_url: Optional[str] = None,
+    geocode_concurrency: int = 1,
+    chunksize: Optional[int] = None,
+    incremental: bool = False,
 ) -> None:
-    df = pd.read_csv(input_path, encoding="utf-8-sig")
-    df["raw_location"] = df.apply(pick_location, axis=1)
-    df["normalized_location"] = df["raw_location"].fillna("").apply(normalize_location)
-
-    unique_locations = sorted(
-        set(loc for loc in df["normalized_location"].unique() if loc)
-    )
-
-    cache = load_cache(cache_path)
-    geolocator = Nominatim(user_agent="nz_it_jobs_heatmap")
-    geocode_fn = RateLimiter(
-        geolocator.geocode,
+    geocode_options = dict(
+        cache_path=cache_path,
         min_delay_seconds=min_delay_seconds,
-        max_retries=2,
-        error_wait_seconds=min_delay_seconds,
-        return_value_on_exception=None,
+        import_json_path=import_json_path,
+        negative_ttl_seconds=negative_ttl_seconds,
+        places_path=places_path,
+        use_gazetteer=use_gazetteer,
+        geocoder_url=geocoder_url,
+        geocode_concurrency=geocode_concurrency,
     )
 
-    coords_lookup: Dict[str, Dict[str, Optional[float]]] = {}
-    for location in unique_locations:
-        coords_lookup[location] = geocode_location(geocode_fn, location, cache)
+    if incremental:
+        add_coordinates_incremental(input_path, output_path, chunksize or 100_000, **geocode_options)
+        return
 
-    df["latitude"] = df["normalized_location"].map(
-        lambda loc: coords_lookup.get(loc, {}).get("latitude")
-    )
-    df["longitude"] = df["normalized_location"].map(
-        lambda loc: coords_lookup.get(loc, {}).get("longitude")
-    )
+    if chunksize:
+        unique_locations = collect_locations(input_path, chunksize)
+        coords_lookup = resolve_coordinates(unique_locations, **geocode_options)
+        rows = annotate_chunks(input_path, output_path, coords_lookup, chunksize)
+        print(f"Wrote {rows} rows to {output_path}")
+        return
 
-    save_cache(cache_path, cache)
-    df.to_csv(output_path, index=False, encoding="utf-8-sig")
+    df = read_frame(input_path, dtype={"job_id": str})
+    df["raw_location"] = coalesce_locations(df)
+    normalized = normalize_locations(df["raw_location"])
+    df["normalized_location"] = normalized
+
+    unique_locations = sorted(loc for loc in normalized.categories if loc)
+    coords_lookup = resolve_coordinates(unique_locations, **geocode_options)
+
+    attach_coordinates(df, normalized, coords_lookup)
+    write_frame(df, output_path)
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Add coordinates to NZ job data CSV.")
-    parser.add_argument("--input", default=DEFAULT_INPUT, help="Input CSV path.")
-    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Output CSV path.")
-    parser.add_argument("--cache", default=DEFAULT_CACHE, help="Cache JSON path.")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Input path (.csv, .parquet or .feather).")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Output path; .parquet/.feather write a typed columnar file.")
+    parser.add_argument(
+        "--cache",
+        default=DEFAULT_CACHE,
+        help="Cache path: JSON file, or SQLite database for .sqlite/.sqlite3/.db.",
+    )
+    parser.add_argument(
+        "--import-cache",
+        default=DEFAULT_CACHE,
+        help="JSON cache imported once into a SQLite cache.",
+    )
+    parser.add_argument(
+        "--negative-ttl-days",
+        type=float,
+        default=DEFAULT_NEGATIVE_TTL_SECONDS / 86400,
+        help="Days before failed lookups in a SQLite cache are retried.",
+    )
+    parser.add_argument(
+        "--places",
+        default=DEFAULT_PLACES,
+        help="Place list (name, latitude, longitude) for offline lookups.",
+    )
+    parser.add_argument(
+        "--no-gazetteer",
+        action="store_true",
+        help="Skip offline lookups and geocode every cache miss.",
+    )
+    parser.add_argument(
+        "--geocoder-url",
+        default=None,
+        help=f"Nominatim-compatible base URL, e.g. a self-hosted server (default: {DEFAULT_BASE_URL}).",
+    )
+    parser.add_argument(
+        "--geocode-concurrency",
+        type=int,
+        default=1,
+        help="Concurrent geocoding requests; above 1 uses the async geocoder. "
+        "Keep 1 with --min-delay 1 for the public Nominatim server.",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the CSV in chunks of this many rows (two passes, constant memory).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Append only rows not yet in the output (matched by job_id, else by row hash).",
+    )
     parser.add_argument(
         "--min-delay",
         type=float,
@@ -155,6 +499,14 @@ def main() -> None:
         output_path=Path(args.output),
         cache_path=Path(args.cache),
         min_delay_seconds=args.min_delay,
+        import_json_path=Path(args.import_cache),
+        negative_ttl_seconds=args.negative_ttl_days * 86400,
+        places_path=Path(args.places),
+        use_gazetteer=not args.no_gazetteer,
+        geocoder_url=args.geocoder_url,
+        geocode_concurrency=args.geocode_concurrency,
+        chunksize=args.chunksize,
+        incremental=args.incremental,
     )
 
 
@@ -0,0 +1,116 @@
+"""
+Concurrent geocoding against a Nominatim-compatible endpoint.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, Optional, Tuple
+
+
+DEFAULT_BASE_URL = "https://nominatim.openstreetmap.org"
+DEFAULT_USER_AGENT = "nz_it_jobs_heatmap"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+Coords = Optional[Tuple[float, float]]
+
+
+class GeocodeError(Exception):
+    """A lookup failed (network error or HTTP error) rather than finding no match."""
+
+
+class AsyncGeocoder:
+    """Runs Nominatim /search lookups concurrently.
+
+    At most ``concurrency`` requests are in flight, request starts are spaced
+    by ``min_delay_seconds``, identical in-flight queries share one request,
+    and transient failures are retried ``max_retries`` times with backoff.
+    ``geocode`` returns None only when the endpoint answers with no match and
+    raises GeocodeError when the lookup itself fails, so callers can cache the
+    former and retry the latter on a later run.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        concurrency: int = 4,
+        min_delay_seconds: float = 0.0,
+        max_retries: int = 2,
+        timeout: float = 10.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.min_delay_seconds = min_delay_seconds
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.requests = 0
+        self.failures = 0
+        self.concurrency = max(1, concurrency)
+        # Created on first use: on Python 3.9 asyncio primitives bind to the
+        # loop current at construction, which is not the one asyncio.run starts
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pace_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next_start = 0.0
+        self._in_flight: Dict[str, "asyncio.Future[Coords]"] = {}
+
+    def _fetch(self, query: str) -> Coords:
+        params = urllib.parse.urlencode({"q": query, "format": "jsonv2", "limit": 1})
+        request = urllib.request.Request(
+            f"{self.base_url}/search?{params}",
+            headers={"User-Agent": self.user_agent, "Accept": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            results = json.loads(response.read().decode("utf-8"))
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._pace_lock = asyncio.Lock()
+
+    async def _pace(self) -> None:
+        if self.min_delay_seconds <= 0:
+            return
+        async with self._pace_lock:
+            wait = self._next_start - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = time.monotonic() + self.min_delay_seconds
+
+    async def _request(self, query: str) -> Coords:
+        self._bind_loop()
+        async with self._semaphore:
+            error: Optional[Exception] = None
+            for attempt in range(self.max_retries + 1):
+                await self._pace()
+                self.requests += 1
+                try:
+                    return await asyncio.to_thread(self._fetch, query)
+                except urllib.error.HTTPError as exc:
+                    error = exc
+                    if exc.code not in RETRY_STATUSES:
+                        break
+                except (urllib.error.URLError, TimeoutError, ValueError, KeyError) as exc:
+                    error = exc
+                if attempt < self.max_retries:
+                    await asyncio.sleep(max(self.min_delay_seconds, 0.5) * 2 ** attempt)
+            self.failures += 1
+            raise GeocodeError(f"{query!r}: {error}") from error
+
+    async def geocode(self, query: str) -> Coords:
+        future = self._in_flight.get(query)
+        if future is None:
+            future = asyncio.ensure_future(self._request(query))
+            self._in_flight[query] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(query, None))
+        return await asyncio.shield(future)
@@ -0,0 +1,121 @@
+"""
+Benchmark add_coordinates row processing
+Compares the per-row apply/map path with the vectorized coalesce, normalize
+and join path on synthetic job rows. Geocoding is replaced by a prebuilt
+coordinates table, so no network access is needed
+"""
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from add_coordinates import (
+    LOCATION_COLUMNS,
+    attach_coordinates,
+    coalesce_locations,
+    normalize_location,
+    normalize_locations,
+)
+
+
+LOCATIONS = [
+    "Auckland CBD", "Wellington Central", "Christchurch Central", "Albany",
+    "Ponsonby, Auckland", "Petone", "Hamilton", "Dunedin", "Napier", "Nelson",
+    "Te Rapa", "Mount Eden", "Palmerston North Central", "Taupo Central",
+]
+REGIONS = ["Auckland", "Wellington", "Canterbury", "Waikato", "Otago"]
+
+
+def build_rows(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build synthetic job rows with blank and missing location columns
+
+    Args:
+        rows: Number of rows
+        seed: Random seed
+
+    Returns:
+        DataFrame with location, city and region columns
+    """
+    rng = np.random.default_rng(seed)
+    suburbs = np.array(LOCATIONS + [f"Suburb {i}" for i in range(200)] + [""], dtype=object)
+    location = suburbs[rng.integers(0, len(suburbs), rows)]
+    location[rng.random(rows) < 0.05] = None
+    city = np.array(REGIONS + [None], dtype=object)[rng.integers(0, len(REGIONS) + 1, rows)]
+    region = np.array(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), rows)]
+    return pd.DataFrame({"location": location, "city": city, "region": region})
+
+
+def _coords_lookup(names) -> Dict[str, Dict[str, Optional[float]]]:
+    return {
+        name: {"latitude": -36.0 - i * 0.01, "longitude": 174.0 + i * 0.01}
+        for i, name in enumerate(sorted(n for n in names if n))
+    }
+
+
+def pick_location(row: pd.Series) -> Optional[str]:
+    """Per-row location pick that coalesce_locations replaced (legacy baseline)"""
+    for col in LOCATION_COLUMNS:
+        raw = row.get(col)
+        if isinstance(raw, str) and raw.strip():
+            return raw.strip()
+    return None
+
+
+def run_legacy(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["raw_location"] = df.apply(pick_location, axis=1)
+    df["normalized_location"] = df["raw_location"].fillna("").apply(normalize_location)
+    coords_lookup = _coords_lookup(df["normalized_location"].unique())
+    df["latitude"] = df["normalized_location"].map(lambda loc: coords_lookup.get(loc, {}).get("latitude"))
+    df["longitude"] = df["normalized_location"].map(lambda loc: coords_lookup.get(loc, {}).get("longitude"))
+    return df
+
+
+def run_vectorized(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["raw_location"] = coalesce_locations(df)
+    normalized = normalize_locations(df["raw_location"])
+    df["normalized_location"] = normalized
+    attach_coordinates(df, normalized, _coords_lookup(normalized.categories))
+    return df
+
+
+def _time(fn, df: pd.DataFrame, repeats: int) -> List[float]:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(df)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark add_coordinates row processing')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000], help='Row counts to benchmark (default: 10k 1M 10M)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per size (default: 3)')
+    parser.add_argument('--legacy-max-rows', type=int, default=1_000_000, help='Skip the per-row path above this many rows (default: 1M)')
+
+    args = parser.parse_args()
+
+    print("="*70)
+    print("add_coordinates row processing benchmark")
+    print("="*70)
+
+    for rows in args.sizes:
+        df = build_rows(rows)
+        vectorized = statistics.median(_time(run_vectorized, df, args.repeats))
+        line = f"  {rows:>11,} rows  vectorized {vectorized:8.3f} s ({rows / vectorized:,.0f} rows/s)"
+        if rows <= args.legacy_max_rows:
+            legacy = statistics.median(_time(run_legacy, df, args.repeats))
+            line += f"  per-row {legacy:8.3f} s  ({legacy / vectorized:.1f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
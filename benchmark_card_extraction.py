@@ -0,0 +1,160 @@
+"""
+Benchmark job card extraction latency
+Compares the browser extraction paths of scrape_nz_jobs.py (per-element, bulk,
+html) on a synthetic Seek search results page, and measures the throughput of
+the offline HTML parser, so no network access is needed
+"""
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from scrape_nz_jobs import (
+    EXTRACTION_METHODS,
+    _launch_browser,
+    _records_to_jobs,
+    _require_playwright,
+    async_playwright,
+    parse_cards_html,
+)
+
+
+BASE_URL = "https://www.seek.co.nz"
+
+CARD_TEMPLATE = """
+<article data-automation="normalJob" data-testid="job-card">
+  <h3><a data-automation="jobTitle" href="/job/{job_id}">Software Engineer {n}</a></h3>
+  <a data-automation="jobCompany">Company {n}</a>
+  <a data-automation="jobLocation">{location}</a>
+  <span data-automation="jobSalary">$90,000 - $120,000 per year</span>
+  <span data-automation="jobShortDescription">Build and run services for customer {n}.</span>
+  <span data-automation="jobListingDate">{n}d ago</span>
+  <span data-automation="jobWorkType">Full time</span>
+</article>
+"""
+
+LOCATIONS = [
+    "Auckland CBD, Auckland",
+    "Wellington Central, Wellington",
+    "Christchurch Central, Canterbury",
+    "Albany, Auckland",
+    "Hamilton",
+]
+
+
+def build_search_page(cards: int) -> str:
+    """
+    Build a search results page with the given number of job cards
+
+    Args:
+        cards: Number of job cards on the page
+
+    Returns:
+        HTML document
+    """
+    body = "".join(
+        CARD_TEMPLATE.format(job_id=80000000 + n, n=n, location=LOCATIONS[n % len(LOCATIONS)])
+        for n in range(cards)
+    )
+    return f"<html><head><title>Jobs</title></head><body><main>{body}</main></body></html>"
+
+
+def _summarize(label: str, timings: List[float], cards: int):
+    mean_ms = statistics.mean(timings) * 1000
+    median_ms = statistics.median(timings) * 1000
+    per_card_ms = mean_ms / cards if cards else 0.0
+    print(f"  {label:<12} mean {mean_ms:8.2f} ms  median {median_ms:8.2f} ms  ({per_card_ms:.3f} ms/card)")
+
+
+async def benchmark_browser(cards: int, repeats: int, browser_name: str) -> Dict[str, List[float]]:
+    """
+    Time every extraction path in EXTRACTION_METHODS on one loaded page
+
+    Args:
+        cards: Number of job cards on the page
+        repeats: Timed runs per path
+        browser_name: Browser to use (chromium, firefox, webkit)
+
+    Returns:
+        Extraction path -> per-page timings in seconds
+    """
+    _require_playwright()
+    html = build_search_page(cards)
+    timings: Dict[str, List[float]] = {}
+
+    async with async_playwright() as p:
+        browser = await _launch_browser(p, browser_name, headless=True)
+        try:
+            page = await browser.new_page()
+            await page.set_content(html)
+            for name, method in EXTRACTION_METHODS.items():
+                # Warm up once so the first timed run is not an outlier
+                await method(page, cards)
+                timings[name] = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    _, records = await method(page, cards)
+                    _records_to_jobs(records, BASE_URL)
+                    timings[name].append(time.perf_counter() - started)
+        finally:
+            await browser.close()
+
+    return timings
+
+
+def benchmark_offline(cards: int, repeats: int) -> List[float]:
+    """
+    Time the offline HTML parser on the synthetic page
+
+    Args:
+        cards: Number of job cards on the page
+        repeats: Timed runs
+
+    Returns:
+        Per-page timings in seconds
+    """
+    html = build_search_page(cards)
+    parse_cards_html(html)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        _, records = parse_cards_html(html)
+        _records_to_jobs(records, BASE_URL)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark job card extraction latency')
+    parser.add_argument('--cards', type=int, default=22, help='Job cards per page (default: 22, one Seek results page)')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed runs per extraction path (default: 20)')
+    parser.add_argument('--browser', type=str, choices=['chromium', 'firefox', 'webkit'], default='chromium', help='Browser engine to use (default: chromium)')
+    parser.add_argument('--offline', action='store_true', help='Only benchmark the offline HTML parser (no browser needed)')
+
+    args = parser.parse_args()
+
+    print("="*70)
+    print(f"Job card extraction benchmark ({args.cards} cards/page, {args.repeats} runs)")
+    print("="*70)
+
+    offline = benchmark_offline(args.cards, args.repeats)
+    _summarize('offline', offline, args.cards)
+    print(f"  offline parser throughput: {1 / statistics.mean(offline):.0f} pages/s per core")
+
+    if args.offline:
+        return
+
+    timings = asyncio.run(benchmark_browser(args.cards, args.repeats, args.browser))
+    for name, values in timings.items():
+        _summarize(name, values, args.cards)
+
+    if 'bulk' in timings and 'per-element' in timings:
+        speedup = statistics.mean(timings['per-element']) / statistics.mean(timings['bulk'])
+        print(f"\n  bulk is {speedup:.1f}x faster than per-element")
+
+
+if __name__ == "__main__":
+    main()
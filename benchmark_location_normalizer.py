@@ -0,0 +1,118 @@
+"""
+Benchmark location normalization as the suburb table grows
+Times LocationNormalizer.metro() (one trie-compiled regex) against the old
+one-regex-per-city sequential checks, with memoization disabled so every
+value is matched from scratch
+"""
+import random
+import re
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from location_normalizer import METRO_CITIES, METRO_SUBURBS, LocationNormalizer
+
+
+SYLLABLES = ["ka", "ra", "to", "wai", "ma", "ngu", "ro", "pa", "ki", "te", "hu", "mo", "ta", "whe", "nui"]
+
+
+def synthetic_suburbs(count: int, seed: int = 0) -> Dict[str, List[str]]:
+    """
+    Extend METRO_SUBURBS with made-up suburb names spread over the cities
+
+    Args:
+        count: Number of extra suburbs
+        seed: Random seed
+
+    Returns:
+        City -> suburb list
+    """
+    rng = random.Random(seed)
+    suburbs = {city: list(names) for city, names in METRO_SUBURBS.items()}
+    cities = list(suburbs)
+    for i in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        suburbs[cities[i % len(cities)]].append(f"{name} {'heights' if i % 3 else 'park'}")
+    return suburbs
+
+
+def sample_values(suburbs: Dict[str, List[str]], count: int, seed: int = 1) -> List[str]:
+    """Scraped-looking values: known suburbs, city names and unknown places"""
+    rng = random.Random(seed)
+    all_suburbs = [name for names in suburbs.values() for name in names]
+    values = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            values.append(f"{rng.choice(all_suburbs).title()}, {rng.choice(METRO_CITIES)}")
+        elif kind == 1:
+            values.append(f"{rng.choice(METRO_CITIES)} Central")
+        else:
+            values.append(f"Unknown Place {i}, Otago")
+    return values
+
+
+def sequential_matcher(suburbs: Dict[str, List[str]]) -> Callable[[str], str]:
+    """The old approach: one alternation regex per city, checked in turn"""
+    patterns = [(re.compile("|".join(map(re.escape, names)), re.I), city) for city, names in suburbs.items()]
+
+    def match(value: str) -> str:
+        for pattern, city in patterns:
+            if pattern.search(value):
+                return city
+        lower = value.lower()
+        for city in METRO_CITIES:
+            if city.lower() in lower:
+                return city
+        return value
+
+    return match
+
+
+def _per_value_us(fn: Callable[[str], str], values: List[str], repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for value in values:
+            fn(value)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) / len(values) * 1e6
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark location normalization as the suburb table grows')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0, 100, 1000, 5000, 20000], help='Extra synthetic suburbs (default: 0 100 1000 5000 20000)')
+    parser.add_argument('--sequential-max', type=int, default=5000, help='Skip the sequential matcher above this many extra suburbs (default: 5000)')
+    parser.add_argument('--values', type=int, default=20000, help='Values normalized per run (default: 20000)')
+
+    args = parser.parse_args()
+
+    print("="*70)
+    print(f"Location normalization benchmark ({args.values} distinct values, no memoization)")
+    print("="*70)
+    print(f"  {'suburbs':>8}  {'trie regex':>12}  {'sequential':>12}")
+
+    for size in args.sizes:
+        suburbs = synthetic_suburbs(size)
+        values = sample_values(suburbs, args.values)
+        normalizer = LocationNormalizer(metro_suburbs=suburbs, cache_size=0)
+        sequential = sequential_matcher(suburbs)
+        total = sum(len(names) for names in suburbs.values())
+        trie_us = _per_value_us(normalizer.metro, values)
+        line = f"  {total:>8}  {trie_us:>9.2f} us"
+        if size <= args.sequential_max:
+            line += f"  {_per_value_us(sequential, values):>9.2f} us"
+        print(line)
+
+    normalizer = LocationNormalizer()
+    values = sample_values(METRO_SUBURBS, args.values)
+    cold = _per_value_us(normalizer.metro, values, repeats=1)
+    warm = _per_value_us(normalizer.metro, values)
+    print(f"\n  memoized repeat lookups: {warm:.2f} us/value (first pass {cold:.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Precompute the map aggregates the Shiny app shows
+Reads nz_jobs_data_with_coords.csv in chunks and writes one row per
+(aggregation level, group, keyword set) with job counts and the coordinate
+and salary sums behind the app's means. The app answers any keyword filter by
+summing the rows whose keyword set overlaps the selection, instead of
+re-running group_by/summarise over every job.
+
+Rows are keyed by each job's full keyword set rather than by single keyword:
+a job found under several keywords then lives in exactly one row, so selecting
+two of its keywords does not count it twice.
+"""
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from columnar_io import iter_frames, read_columns
+from location_normalizer import metro_city
+
+
+DEFAULT_INPUT = "nz_jobs_data_with_coords.csv"
+DEFAULT_OUTPUT = "nz_jobs_aggregates.csv"
+DEFAULT_CHUNKSIZE = 200_000
+
+# Aggregation levels, matching get_group_col() in R/services/jobs_service.R
+LEVELS = ("location", "city")
+KEY_COLUMNS = ["level", "group", "keywords"]
+SUM_COLUMNS = ["job_count", "latitude_sum", "longitude_sum", "salary_sum", "salary_count"]
+SOURCE_COLUMNS = [
+    "raw_location", "location", "metro_city", "search_keyword", "search_keywords",
+    "latitude", "longitude", "salary_min",
+]
+
+
+def _text(chunk: pd.DataFrame, column: str) -> pd.Series:
+    if column not in chunk.columns:
+        return pd.Series("", index=chunk.index)
+    return chunk[column].fillna("").str.strip()
+
+
+def keyword_sets(chunk: pd.DataFrame) -> np.ndarray:
+    """
+    Canonical keyword set per row ('|'-joined, sorted, deduplicated)
+
+    Args:
+        chunk: Rows with search_keywords and/or search_keyword
+
+    Returns:
+        Object array of keyword set strings ("" when a row has none)
+    """
+    merged = _text(chunk, "search_keywords")
+    merged = merged.where(merged != "", _text(chunk, "search_keyword"))
+    codes, uniques = pd.factorize(merged)
+    canonical = [
+        "|".join(sorted({k.strip() for k in value.split("|") if k.strip()}))
+        for value in uniques
+    ]
+    return np.array(canonical + [""], dtype=object)[codes]
+
+
+def group_names(chunk: pd.DataFrame) -> dict:
+    """
+    Group per row for each aggregation level, mirroring prepare_jobs_raw() in R
+
+    Args:
+        chunk: Rows from the coordinates CSV
+
+    Returns:
+        Level -> object array of group names ("" when unknown)
+    """
+    base = _text(chunk, "raw_location") if "raw_location" in chunk.columns else _text(chunk, "location")
+    codes, uniques = pd.factorize(base)
+    name_city = np.array([metro_city(value) for value in uniques] + [""], dtype=object)[codes]
+    by_coords = _text(chunk, "metro_city").to_numpy(dtype=object)
+    return {
+        "location": base.to_numpy(dtype=object),
+        "city": np.where(by_coords != "", by_coords, name_city),
+    }
+
+
+def aggregate_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Partial sums for one chunk
+
+    Args:
+        chunk: Rows from columnar_io.iter_frames
+
+    Returns:
+        DataFrame with KEY_COLUMNS + SUM_COLUMNS
+    """
+    lat = pd.to_numeric(chunk["latitude"], errors="coerce")
+    lon = pd.to_numeric(chunk["longitude"], errors="coerce")
+    # Same rows aggregate_jobs() keeps: the map needs coordinates
+    has_coords = (lat.notna() & lon.notna()).to_numpy()
+    chunk = chunk[has_coords]
+    salary = pd.to_numeric(chunk["salary_min"], errors="coerce") if "salary_min" in chunk.columns else pd.Series(np.nan, index=chunk.index)
+
+    values = pd.DataFrame({
+        "keywords": keyword_sets(chunk),
+        "job_count": 1,
+        "latitude_sum": lat[has_coords].to_numpy(),
+        "longitude_sum": lon[has_coords].to_numpy(),
+        "salary_sum": salary.fillna(0.0).to_numpy(),
+        "salary_count": salary.notna().astype(np.int64).to_numpy(),
+    })
+
+    parts = []
+    for level, groups in group_names(chunk).items():
+        part = values.assign(level=level, group=groups)
+        parts.append(part.groupby(KEY_COLUMNS, sort=False)[SUM_COLUMNS].sum().reset_index())
+    return pd.concat(parts, ignore_index=True)
+
+
+def build_cube(input_path: Path, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """
+    Aggregate the whole coordinates CSV
+
+    Args:
+        input_path: CSV (or Parquet/Feather) written by add_coordinates.py
+        chunksize: Rows read per chunk
+
+    Returns:
+        Cube DataFrame sorted by level, group and keyword set
+    """
+    header = read_columns(input_path)
+    usecols = [c for c in SOURCE_COLUMNS if c in header]
+    partials: List[pd.DataFrame] = []
+    for chunk in iter_frames(input_path, chunksize, columns=usecols):
+        partials.append(aggregate_chunk(chunk))
+        # Keep memory bounded by the number of distinct keys, not rows
+        if len(partials) >= 16:
+            partials = [pd.concat(partials).groupby(KEY_COLUMNS, sort=False)[SUM_COLUMNS].sum().reset_index()]
+
+    if not partials:
+        return pd.DataFrame(columns=KEY_COLUMNS + SUM_COLUMNS)
+    cube = pd.concat(partials).groupby(KEY_COLUMNS)[SUM_COLUMNS].sum().reset_index()
+    return cube.astype({"job_count": np.int64, "salary_count": np.int64})
+
+
+def write_cube(cube: pd.DataFrame, output_path: Path):
+    """Write the cube atomically so the app never reads a partial file"""
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    cube.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+    tmp_path.replace(output_path)
+
+
+def query_cube(cube: pd.DataFrame, level: str, keywords: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Per-group counts and means for a keyword selection, as the app computes them
+
+    Args:
+        cube: Output of build_cube
+        level: "location" or "city"
+        keywords: Selected keywords (None or empty for all jobs)
+
+    Returns:
+        DataFrame with location_name, job_count, latitude, longitude, avg_salary
+    """
+    rows = cube[cube["level"] == level]
+    if keywords:
+        selected = set(keywords)
+        sets = rows["keywords"].fillna("").unique()
+        matching = [s for s in sets if selected.intersection(s.split("|"))]
+        rows = rows[rows["keywords"].isin(matching)]
+    sums = rows.groupby("group")[SUM_COLUMNS].sum()
+    return pd.DataFrame({
+        "location_name": sums.index,
+        "job_count": sums["job_count"].to_numpy(),
+        "latitude": (sums["latitude_sum"] / sums["job_count"]).to_numpy(),
+        "longitude": (sums["longitude_sum"] / sums["job_count"]).to_numpy(),
+        "avg_salary": (sums["salary_sum"] / sums["salary_count"].replace(0, np.nan)).to_numpy(),
+    })
+
+
+def main():
+    """Main function"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Precompute the job map aggregates for the Shiny app')
+    parser.add_argument('--input', type=str, default=DEFAULT_INPUT, help=f'CSV, Parquet or Feather file written by add_coordinates.py (default: {DEFAULT_INPUT})')
+    parser.add_argument('--output', type=str, default=DEFAULT_OUTPUT, help=f'Aggregate CSV path (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help=f'Rows read per chunk (default: {DEFAULT_CHUNKSIZE})')
+
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    output_path = Path(args.output)
+    if not input_path.exists():
+        print(f"Input file not found: {input_path}")
+        return
+
+    started = time.perf_counter()
+    cube = build_cube(input_path, args.chunksize)
+    write_cube(cube, output_path)
+
+    print("="*60)
+    print(f"Aggregate cube: {output_path}")
+    print("="*60)
+    for level in LEVELS:
+        rows = cube[cube["level"] == level]
+        print(f"  {level}: {rows['group'].nunique()} groups, {len(rows)} rows")
+    print(f"  jobs with coordinates: {int(cube.loc[cube['level'] == LEVELS[0], 'job_count'].sum())}")
+    print(f"  done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
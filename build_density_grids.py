@@ -0,0 +1,305 @@
+"""
+Precompute heatmap density grids for the Shiny map
+Bins every job with coordinates into Web Mercator cells at several zoom
+levels, so the heatmap draws one weighted point per occupied cell instead of
+one point per job. Cells are computed once at the finest zoom; each coarser
+level is the same integer cell index shifted right by one bit per zoom step,
+so all levels come from a single projection pass.
+
+Optional keyword layers are keyed by each job's keyword set (as in
+build_aggregate_cube.py), so summing the layers for a multi-keyword selection
+counts every job once.
+
+Output is a single columnar binary file:
+    b"NZJD", uint32 version, uint32 header length, JSON header,
+    then one little-endian array per column listed in the header
+"""
+import json
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from build_aggregate_cube import keyword_sets
+from columnar_io import iter_frames, read_columns
+
+
+DEFAULT_INPUT = "nz_jobs_data_with_coords.csv"
+DEFAULT_OUTPUT = "nz_jobs_density.bin"
+DEFAULT_ZOOMS = (5, 6, 7, 8, 9, 10, 11, 12)
+# Cell edge in screen pixels; a power of two so levels nest exactly
+DEFAULT_CELL_PX = 16
+DEFAULT_CHUNKSIZE = 500_000
+
+MAGIC = b"NZJD"
+FORMAT_VERSION = 1
+# Keyword set index of the layer that holds every job
+ALL_KEYWORDS = -1
+MAX_MERCATOR_LAT = 85.05112878
+
+COLUMNS = [
+    ("level", np.uint8),
+    ("keyword_set", np.int16),
+    ("latitude", np.float32),
+    ("longitude", np.float32),
+    ("count", np.uint32),
+]
+
+
+def mercator_cells(lat: np.ndarray, lon: np.ndarray, zoom: int, cell_px: int = DEFAULT_CELL_PX) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Integer Web Mercator cell indices at a zoom level
+
+    Args:
+        lat: Latitudes in degrees
+        lon: Longitudes in degrees
+        zoom: Map zoom level
+        cell_px: Cell edge in 256 px tile pixels
+
+    Returns:
+        Tuple of (cell x, cell y) int64 arrays
+    """
+    cells = (256 << zoom) // cell_px
+    lat_rad = np.radians(np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0
+    cx = np.clip((x * cells).astype(np.int64), 0, cells - 1)
+    cy = np.clip((y * cells).astype(np.int64), 0, cells - 1)
+    return cx, cy
+
+
+def cell_centers(cx: np.ndarray, cy: np.ndarray, zoom: int, cell_px: int = DEFAULT_CELL_PX) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude and longitude of cell centres (inverse of mercator_cells)"""
+    cells = (256 << zoom) // cell_px
+    lon = (cx + 0.5) / cells * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * (cy + 0.5) / cells))))
+    return lat, lon
+
+
+def read_points(input_path: Path, chunksize: int = DEFAULT_CHUNKSIZE, by_keyword: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    Coordinates (and keyword set codes) of every job with coordinates
+
+    Args:
+        input_path: CSV (or Parquet/Feather) written by add_coordinates.py
+        chunksize: Rows read per chunk
+        by_keyword: Also return keyword set codes
+
+    Returns:
+        Tuple of (latitude, longitude, keyword set codes, keyword sets)
+    """
+    header = read_columns(input_path)
+    usecols = ["latitude", "longitude"]
+    if by_keyword:
+        usecols += [c for c in ("search_keyword", "search_keywords") if c in header]
+
+    lats, lons, codes = [], [], []
+    set_index: Dict[str, int] = {}
+    for chunk in iter_frames(input_path, chunksize, columns=usecols):
+        lat = pd.to_numeric(chunk["latitude"], errors="coerce").to_numpy()
+        lon = pd.to_numeric(chunk["longitude"], errors="coerce").to_numpy()
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        lats.append(lat[valid])
+        lons.append(lon[valid])
+        if by_keyword:
+            sets = keyword_sets(chunk[valid])
+            chunk_codes, uniques = pd.factorize(sets)
+            mapping = np.array([set_index.setdefault(s, len(set_index)) for s in uniques], dtype=np.int64)
+            codes.append(mapping[chunk_codes])
+
+    lat = np.concatenate(lats) if lats else np.empty(0)
+    lon = np.concatenate(lons) if lons else np.empty(0)
+    set_codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.int64)
+    return lat, lon, set_codes, list(set_index)
+
+
+def build_grids(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    zooms: Sequence[int] = DEFAULT_ZOOMS,
+    cell_px: int = DEFAULT_CELL_PX,
+    set_codes: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Occupied cells and job counts at every zoom level
+
+    Args:
+        lat: Latitudes
+        lon: Longitudes
+        zooms: Zoom levels to build
+        cell_px: Cell edge in pixels (power of two)
+        set_codes: Keyword set code per point; adds one layer per keyword set
+
+    Returns:
+        Column name -> array, with the dtypes in COLUMNS
+    """
+    zooms = sorted(set(zooms))
+    finest = zooms[-1]
+    fx, fy = mercator_cells(lat, lon, finest, cell_px)
+    # Cells per axis is a power of two, so a cell packs into (y << bits) | x
+    bits = ((256 << finest) // cell_px).bit_length() - 1
+
+    layers = [(np.full(len(fx), ALL_KEYWORDS + 1, dtype=np.int64), "all")]
+    if set_codes is not None and len(set_codes):
+        layers.append((np.asarray(set_codes, dtype=np.int64) + 1, "keyword"))
+
+    out: Dict[str, List[np.ndarray]] = {name: [] for name, _ in COLUMNS}
+    for layer_codes, _ in layers:
+        # Only the finest level sorts every point; each coarser level rolls up
+        # the (much shorter) occupied cell list of the level above
+        keys, counts = np.unique((layer_codes << (2 * bits)) | (fy << bits) | fx, return_counts=True)
+        level_bits = bits
+        for zoom in reversed(zooms):
+            while level_bits > bits - (finest - zoom):
+                keys, counts = _roll_up(keys, counts, level_bits)
+                level_bits -= 1
+            _append_level(out, zoom, keys, counts, level_bits, cell_px)
+
+    return {
+        name: np.concatenate(out[name]).astype(dtype) if out[name] else np.empty(0, dtype=dtype)
+        for name, dtype in COLUMNS
+    }
+
+
+def _roll_up(keys: np.ndarray, counts: np.ndarray, bits: int) -> Tuple[np.ndarray, np.ndarray]:
+    mask = (1 << bits) - 1
+    layer = keys >> (2 * bits)
+    cy = (keys >> bits) & mask
+    cx = keys & mask
+    parent = (layer << (2 * bits - 2)) | ((cy >> 1) << (bits - 1)) | (cx >> 1)
+    parents, inverse = np.unique(parent, return_inverse=True)
+    return parents, np.bincount(inverse, weights=counts).astype(np.int64)
+
+
+def _append_level(out: Dict[str, List[np.ndarray]], zoom: int, keys: np.ndarray, counts: np.ndarray, bits: int, cell_px: int):
+    mask = (1 << bits) - 1
+    lat, lon = cell_centers(keys & mask, (keys >> bits) & mask, zoom, cell_px)
+    out["level"].append(np.full(len(keys), zoom))
+    out["keyword_set"].append((keys >> (2 * bits)) - 1)
+    out["latitude"].append(lat)
+    out["longitude"].append(lon)
+    out["count"].append(counts)
+
+
+def write_grids(grids: Dict[str, np.ndarray], output_path: Path, zooms: Sequence[int], cell_px: int, keyword_sets: Sequence[str]):
+    """
+    Write grids in the columnar binary format (atomically)
+
+    Args:
+        grids: Output of build_grids
+        output_path: Destination file
+        zooms: Zoom levels in the file
+        cell_px: Cell edge in pixels
+        keyword_sets: Keyword set strings, indexed by the keyword_set column
+    """
+    header = json.dumps({
+        "rows": int(len(grids["count"])),
+        "levels": sorted(set(zooms)),
+        "cell_px": cell_px,
+        "all_keywords": ALL_KEYWORDS,
+        "keyword_sets": list(keyword_sets),
+        "columns": [{"name": name, "dtype": np.dtype(dtype).name} for name, dtype in COLUMNS],
+    }).encode("utf-8")
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack("<II", FORMAT_VERSION, len(header)))
+        handle.write(header)
+        for name, dtype in COLUMNS:
+            handle.write(np.ascontiguousarray(grids[name], dtype=np.dtype(dtype).newbyteorder("<")).tobytes())
+    tmp_path.replace(output_path)
+
+
+def read_grids(path: Path) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """
+    Read a file written by write_grids
+
+    Returns:
+        Tuple of (header dict, column name -> array)
+    """
+    with open(path, "rb") as handle:
+        if handle.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a density grid file")
+        version, header_len = struct.unpack("<II", handle.read(8))
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported density grid version {version}")
+        header = json.loads(handle.read(header_len).decode("utf-8"))
+        rows = header["rows"]
+        columns = {}
+        for column in header["columns"]:
+            dtype = np.dtype(column["dtype"]).newbyteorder("<")
+            columns[column["name"]] = np.frombuffer(handle.read(rows * dtype.itemsize), dtype=dtype)
+    return header, columns
+
+
+def benchmark(rows: int, zooms: Sequence[int] = DEFAULT_ZOOMS, keyword_sets: int = 20) -> float:
+    """
+    Time building every level (and keyword layers) for random NZ points
+
+    Args:
+        rows: Number of points
+        zooms: Zoom levels
+        keyword_sets: Distinct keyword sets to spread the points over
+
+    Returns:
+        Seconds taken
+    """
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-46.6, -34.4, rows)
+    lon = rng.uniform(166.4, 178.6, rows)
+    set_codes = rng.integers(0, keyword_sets, rows)
+    started = time.perf_counter()
+    build_grids(lat, lon, zooms, DEFAULT_CELL_PX, set_codes)
+    return time.perf_counter() - started
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Precompute multi-resolution heatmap density grids')
+    parser.add_argument('--input', type=str, default=DEFAULT_INPUT, help=f'CSV, Parquet or Feather file written by add_coordinates.py (default: {DEFAULT_INPUT})')
+    parser.add_argument('--output', type=str, default=DEFAULT_OUTPUT, help=f'Grid file path (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--zooms', type=int, nargs='+', default=list(DEFAULT_ZOOMS), help='Zoom levels to build (default: 5-12)')
+    parser.add_argument('--cell-px', type=int, default=DEFAULT_CELL_PX, help=f'Cell edge in screen pixels, a power of two (default: {DEFAULT_CELL_PX})')
+    parser.add_argument('--by-keyword', action='store_true', help='Also build one layer per keyword set')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help=f'Rows read per chunk (default: {DEFAULT_CHUNKSIZE})')
+    parser.add_argument('--benchmark', type=int, default=None, metavar='ROWS', help='Time building grids for ROWS random points instead')
+
+    args = parser.parse_args()
+
+    if args.cell_px <= 0 or args.cell_px & (args.cell_px - 1) or args.cell_px > 256:
+        parser.error("--cell-px must be a power of two no larger than 256")
+
+    if args.benchmark:
+        seconds = benchmark(args.benchmark, args.zooms)
+        print(f"Built {len(set(args.zooms))} levels with keyword layers for {args.benchmark:,} points in {seconds:.2f}s")
+        return
+
+    input_path = Path(args.input)
+    output_path = Path(args.output)
+    if not input_path.exists():
+        print(f"Input file not found: {input_path}")
+        return
+
+    started = time.perf_counter()
+    lat, lon, set_codes, sets = read_points(input_path, args.chunksize, args.by_keyword)
+    read_seconds = time.perf_counter() - started
+    grids = build_grids(lat, lon, args.zooms, args.cell_px, set_codes if args.by_keyword else None)
+    write_grids(grids, output_path, args.zooms, args.cell_px, sets)
+
+    print("="*60)
+    print(f"Density grids: {output_path} ({output_path.stat().st_size / 1024:.1f} KB)")
+    print("="*60)
+    print(f"  points: {len(lat)}, keyword sets: {len(sets) if args.by_keyword else 0}")
+    for zoom in sorted(set(args.zooms)):
+        level = (grids["level"] == zoom) & (grids["keyword_set"] == ALL_KEYWORDS)
+        print(f"  zoom {zoom:>2}: {int(level.sum())} cells")
+    print(f"  read {read_seconds:.2f}s, total {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,158 +3,507 @@ Check CSV file for heatmap visualization requirements
 Analyzes if the CSV has proper geographic data for R Shiny heatmap
 """
 import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
-def analyze_csv_for_heatmap(csv_path: str):
-    """Analyze CSV file for heatmap visualization requirements"""
-    
-    csv_file = Path(csv_path)
-    if not csv_file.exists():
-        print(f"Error: CSV file not found: {csv_path}")
-        return
-    
-    print("="*70)
-    print("CSV File Analysis for Heatmap Visualization")
-    print("="*70)
-    
-    with open(csv_file, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-    
-    total_rows = len(rows)
-    print(f"\n1. Basic Statistics:")
-    print(f"   Total rows: {total_rows}")
-    print(f"   Columns: {', '.join(reader.fieldnames)}")
-    
-    # Check geographic fields
-    print(f"\n2. Geographic Data Analysis:")
-    
-    # Location field
-    locations = [r.get('location', '').strip() for r in rows if r.get('location', '').strip()]
-    location_count = len(locations)
-    location_coverage = (location_count / total_rows * 100) if total_rows > 0 else 0
-    print(f"   Location field:")
-    print(f"     - Rows with data: {location_count} ({location_coverage:.1f}%)")
-    print(f"     - Unique locations: {len(set(locations))}")
-    
-    # City field
-    cities = [r.get('city', '').strip() for r in rows if r.get('city', '').strip()]
-    city_count = len(cities)
-    city_coverage = (city_count / total_rows * 100) if total_rows > 0 else 0
-    print(f"   City field:")
-    print(f"     - Rows with data: {city_count} ({city_coverage:.1f}%)")
-    print(f"     - Unique cities: {len(set(cities))}")
-    
-    # Region field
-    regions = [r.get('region', '').strip() for r in rows if r.get('region', '').strip()]
-    region_count = len(regions)
-    region_coverage = (region_count / total_rows * 100) if total_rows > 0 else 0
-    print(f"   Region field:")
-    print(f"     - Rows with data: {region_count} ({region_coverage:.1f}%)")
-    print(f"     - Unique regions: {len(set(regions))}")
-    
-    # Top locations
-    print(f"\n3. Top 10 Locations (by job count):")
-    location_counts = Counter(locations)
-    for i, (loc, count) in enumerate(location_counts.most_common(10), 1):
-        print(f"   {i}. {loc}: {count} jobs")
-    
-    # Top cities
-    print(f"\n4. Top 10 Cities (by job count):")
-    city_counts = Counter(cities)
-    for i, (city, count) in enumerate(city_counts.most_common(10), 1):
-        print(f"   {i}. {city}: {count} jobs")
-    
-    # Top regions
-    print(f"\n5. Top Regions (by job count):")
-    region_counts = Counter(regions)
-    for i, (region, count) in enumerate(region_counts.most_common(10), 1):
-        print(f"   {i}. {region}: {count} jobs")
-    
-    # Data quality check
-    print(f"\n6. Data Quality Assessment:")
-    
-    # Check for missing geographic data
-    missing_geo = sum(1 for r in rows if not r.get('location', '').strip() and 
-                     not r.get('city', '').strip() and not r.get('region', '').strip())
-    print(f"   Rows missing all geographic data: {missing_geo}")
-    
-    # Check if we have enough data for heatmap
-    has_location = location_count > 0
-    has_city = city_count > 0
-    has_region = region_count > 0
-    has_multiple_locations = len(set(locations)) > 1
-    
-    print(f"\n7. Heatmap Readiness Check:")
-    
+from stream_sketches import HyperLogLog, SpaceSaving
+
+
+GEO_FIELDS = ['location', 'city', 'region']
+DEFAULT_TOP_N = 10
+# Space-saving table size per field in approximate mode
+DEFAULT_TOP_CAPACITY = 1000
+
+# Batch mode: snapshots written by scrape_nz_jobs.py, and the per-file result cache
+# Only the timestamped scrape outputs (nz_jobs_YYYYMMDD_HHMMSS.csv), not the
+# coordinates, aggregate, details, shard or backup files written beside them
+SNAPSHOT_PATTERN = r'nz_jobs_\d{8}_\d{6}\.csv'
+DEFAULT_CACHE_DIR = '.heatmap_report_cache'
+CACHE_VERSION = 1
+
+
+class HeatmapStats:
+    """
+    Statistics for the heatmap readiness report, collected in one pass
+
+    Exact mode keeps a Counter per geographic field (memory grows with the
+    number of unique values, not rows). Approximate mode keeps a HyperLogLog
+    sketch and a space-saving top-k table per field instead, so memory is
+    fixed. Two instances can be merged, e.g. partial results of several files.
+    """
+
+    def __init__(self, approximate: bool = False, top_capacity: int = DEFAULT_TOP_CAPACITY):
+        self.approximate = approximate
+        self.rows = 0
+        self.columns: List[str] = []
+        self.missing_geo = 0
+        self.has_title = False
+        self.has_company = False
+        self.rows_with_data = {field: 0 for field in GEO_FIELDS}
+        if approximate:
+            self.uniques = {field: HyperLogLog() for field in GEO_FIELDS}
+            self.top = {field: SpaceSaving(top_capacity) for field in GEO_FIELDS}
+        else:
+            self.counts = {field: Counter() for field in GEO_FIELDS}
+
+    def add_columns(self, columns: List[str]):
+        self.columns.extend(col for col in columns if col not in self.columns)
+
+    def add_value(self, field: str, value: str):
+        self.rows_with_data[field] += 1
+        if self.approximate:
+            self.uniques[field].add(value)
+            self.top[field].add(value)
+        else:
+            self.counts[field][value] += 1
+
+    def merge(self, other: "HeatmapStats"):
+        if other.approximate != self.approximate:
+            raise ValueError("cannot merge exact and approximate statistics")
+        self.rows += other.rows
+        self.add_columns(other.columns)
+        self.missing_geo += other.missing_geo
+        self.has_title = self.has_title or other.has_title
+        self.has_company = self.has_company or other.has_company
+        for field in GEO_FIELDS:
+            self.rows_with_data[field] += other.rows_with_data[field]
+            if self.approximate:
+                self.uniques[field].merge(other.uniques[field])
+                self.top[field].merge(other.top[field])
+            else:
+                self.counts[field].update(other.counts[field])
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serializable state, restored with from_state()"""
+        state = {
+            'approximate': self.approximate,
+            'rows': self.rows,
+            'columns': self.columns,
+            'missing_geo': self.missing_geo,
+            'has_title': self.has_title,
+            'has_company': self.has_company,
+            'rows_with_data': self.rows_with_data,
+        }
+        if self.approximate:
+            state['uniques'] = {field: self.uniques[field].registers.hex() for field in GEO_FIELDS}
+            state['top'] = {field: self.top[field].counts for field in GEO_FIELDS}
+        else:
+            state['counts'] = {field: dict(self.counts[field]) for field in GEO_FIELDS}
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "HeatmapStats":
+        stats = cls(state['approximate'])
+        stats.rows = state['rows']
+        stats.columns = list(state['columns'])
+        stats.missing_geo = state['missing_geo']
+        stats.has_title = state['has_title']
+        stats.has_company = state['has_company']
+        stats.rows_with_data = dict(state['rows_with_data'])
+        for field in GEO_FIELDS:
+            if stats.approximate:
+                stats.uniques[field].registers = bytearray.fromhex(state['uniques'][field])
+                for value, count in state['top'][field].items():
+                    stats.top[field].add(value, count)
+            else:
+                stats.counts[field] = Counter(state['counts'][field])
+        return stats
+
+    def unique(self, field: str) -> int:
+        if self.approximate:
+            return self.uniques[field].count()
+        return len(self.counts[field])
+
+    def most_common(self, field: str, n: int) -> List[List[Any]]:
+        top = self.top[field] if self.approximate else self.counts[field]
+        return [[value, count] for value, count in top.most_common(n)]
+
+
+def collect_heatmap_stats(csv_path: str, approximate: bool = False) -> HeatmapStats:
+    """
+    Stream a CSV file once and collect everything the report needs
+
+    Args:
+        csv_path: CSV file path
+        approximate: Use bounded-memory sketches instead of exact Counters
+
+    Returns:
+        Collected statistics
+    """
+    stats = HeatmapStats(approximate)
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        stats.add_columns(header)
+        geo_indexes = [(field, header.index(field)) for field in GEO_FIELDS if field in header]
+        title_index = header.index('title') if 'title' in header else None
+        company_index = header.index('company') if 'company' in header else None
+
+        for row in reader:
+            stats.rows += 1
+            width = len(row)
+            has_geo = False
+            for field, index in geo_indexes:
+                value = row[index].strip() if index < width else ''
+                if value:
+                    has_geo = True
+                    stats.add_value(field, value)
+            if not has_geo:
+                stats.missing_geo += 1
+            if not stats.has_title and title_index is not None and title_index < width and row[title_index].strip():
+                stats.has_title = True
+            if not stats.has_company and company_index is not None and company_index < width and row[company_index].strip():
+                stats.has_company = True
+    return stats
+
+
+def build_report(stats: HeatmapStats, top_n: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+    """
+    Turn collected statistics into the readiness report
+
+    Args:
+        stats: Collected statistics
+        top_n: Number of top values listed per field
+
+    Returns:
+        Report dictionary (JSON serializable)
+    """
+    total_rows = stats.rows
+    fields = {}
+    for field in GEO_FIELDS:
+        count = stats.rows_with_data[field]
+        fields[field] = {
+            'rows_with_data': count,
+            # Unrounded so the 80% checks match the baseline; rounded on output
+            'coverage_pct': count / total_rows * 100 if total_rows > 0 else 0.0,
+            'unique': stats.unique(field),
+            'top': stats.most_common(field, top_n),
+        }
+
+    location, city, region = fields['location'], fields['city'], fields['region']
     issues = []
     recommendations = []
-    
-    if not has_location and not has_city:
+    if not location['rows_with_data'] and not city['rows_with_data']:
         issues.append("[X] Missing location/city data")
         recommendations.append("Ensure location or city field has data")
-    else:
-        print(f"   [OK] Geographic data available")
-    
-    if not has_multiple_locations:
+    if location['unique'] <= 1:
         issues.append("[!] Only one unique location found")
         recommendations.append("May need more diverse location data")
-    else:
-        print(f"   [OK] Multiple locations available ({len(set(locations))} unique)")
-    
-    if location_coverage < 80:
-        issues.append(f"[!] Only {location_coverage:.1f}% of rows have location data")
+    if location['coverage_pct'] < 80:
+        issues.append(f"[!] Only {location['coverage_pct']:.1f}% of rows have location data")
         recommendations.append("Consider improving location data coverage")
+
+    if region['rows_with_data'] > 0 and region['unique'] >= 3:
+        aggregation_level = 'region'
+    elif city['rows_with_data'] > 0 and city['unique'] >= 5:
+        aggregation_level = 'city'
     else:
-        print(f"   [OK] Good location data coverage ({location_coverage:.1f}%)")
-    
-    # Check for Shiny compatibility
+        aggregation_level = 'location'
+
+    return {
+        'rows': total_rows,
+        'columns': stats.columns,
+        'approximate': stats.approximate,
+        'fields': fields,
+        'missing_geo': stats.missing_geo,
+        'has_title': stats.has_title,
+        'has_company': stats.has_company,
+        'issues': issues,
+        'recommendations': recommendations,
+        'ready': not issues,
+        'aggregation_level': aggregation_level,
+    }
+
+
+def _rounded_for_output(value: Any) -> Any:
+    """Copy of a report with coverage percentages rounded to one decimal for JSON output"""
+    if isinstance(value, dict):
+        return {
+            key: round(item, 1) if key.endswith('coverage_pct') else _rounded_for_output(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_rounded_for_output(item) for item in value]
+    return value
+
+
+def print_report(report: Dict[str, Any]):
+    """Print the readiness report in the original section layout"""
+    fields = report['fields']
+    location, city, region = fields['location'], fields['city'], fields['region']
+    approx = " (approximate)" if report['approximate'] else ""
+
+    print("="*70)
+    print("CSV File Analysis for Heatmap Visualization")
+    print("="*70)
+
+    print(f"\n1. Basic Statistics:")
+    print(f"   Total rows: {report['rows']}")
+    print(f"   Columns: {', '.join(report['columns'])}")
+
+    print(f"\n2. Geographic Data Analysis{approx}:")
+    for field, label in (('location', 'Location'), ('city', 'City'), ('region', 'Region')):
+        data = fields[field]
+        plural = {'location': 'locations', 'city': 'cities', 'region': 'regions'}[field]
+        print(f"   {label} field:")
+        print(f"     - Rows with data: {data['rows_with_data']} ({data['coverage_pct']:.1f}%)")
+        print(f"     - Unique {plural}: {data['unique']}")
+
+    for number, field, title in ((3, 'location', 'Top 10 Locations'), (4, 'city', 'Top 10 Cities'), (5, 'region', 'Top Regions')):
+        print(f"\n{number}. {title} (by job count):")
+        for i, (value, count) in enumerate(fields[field]['top'], 1):
+            print(f"   {i}. {value}: {count} jobs")
+
+    print(f"\n6. Data Quality Assessment:")
+    print(f"   Rows missing all geographic data: {report['missing_geo']}")
+
+    print(f"\n7. Heatmap Readiness Check:")
+    if location['rows_with_data'] or city['rows_with_data']:
+        print(f"   [OK] Geographic data available")
+    if location['unique'] > 1:
+        print(f"   [OK] Multiple locations available ({location['unique']} unique)")
+    if location['coverage_pct'] >= 80:
+        print(f"   [OK] Good location data coverage ({location['coverage_pct']:.1f}%)")
+
     print(f"\n8. R Shiny Compatibility:")
-    
-    # Check encoding
     print(f"   [OK] CSV encoding: UTF-8 with BOM (utf-8-sig) - Good for R")
-    
-    # Check if data is structured properly
-    has_title = any(r.get('title', '').strip() for r in rows)
-    has_company = any(r.get('company', '').strip() for r in rows)
-    
-    if has_title and has_company:
+    if report['has_title'] and report['has_company']:
         print(f"   [OK] Essential fields (title, company) present")
-    
-    # Final assessment
+
     print(f"\n9. Final Assessment:")
-    
-    if not issues:
+    if report['ready']:
         print(f"   [OK] CSV file is READY for heatmap visualization!")
         print(f"   [OK] Geographic data is sufficient for R Shiny")
         print(f"   [OK] File format is compatible with R")
     else:
         print(f"   [!] Issues found:")
-        for issue in issues:
+        for issue in report['issues']:
             print(f"      {issue}")
-    
-    if recommendations:
+
+    if report['recommendations']:
         print(f"\n10. Recommendations:")
-        for rec in recommendations:
+        for rec in report['recommendations']:
             print(f"   - {rec}")
-    
-    # Suggest aggregation level
+
     print(f"\n11. Suggested Heatmap Aggregation Level:")
-    
-    if region_count > 0 and len(set(regions)) >= 3:
+    if report['aggregation_level'] == 'region':
         print(f"   [OK] REGION level - Best for overview heatmap")
         print(f"     Use 'region' field for geographic grouping")
-    elif city_count > 0 and len(set(cities)) >= 5:
+    elif report['aggregation_level'] == 'city':
         print(f"   [OK] CITY level - Good for detailed heatmap")
         print(f"     Use 'city' field for geographic grouping")
     else:
         print(f"   [!] LOCATION level - May need data normalization")
         print(f"     Consider standardizing location names")
-    
+
     print(f"\n" + "="*70)
     print("Analysis Complete!")
     print("="*70)
 
+
+def analyze_csv_for_heatmap(csv_path: str, approximate: bool = False, as_json: bool = False, top_n: int = DEFAULT_TOP_N) -> Optional[Dict[str, Any]]:
+    """
+    Analyze CSV file for heatmap visualization requirements
+
+    Args:
+        csv_path: CSV file path
+        approximate: Use bounded-memory sketches (HyperLogLog, space-saving top-k)
+        as_json: Print the report as JSON instead of text
+        top_n: Number of top values listed per field
+
+    Returns:
+        Report dictionary, or None if the file does not exist
+    """
+    csv_file = Path(csv_path)
+    if not csv_file.exists():
+        print(f"Error: CSV file not found: {csv_path}", file=sys.stderr)
+        return None
+
+    report = build_report(collect_heatmap_stats(str(csv_file), approximate), top_n)
+    report['path'] = str(csv_file)
+    if as_json:
+        print(json.dumps(_rounded_for_output(report), ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return report
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _analyze_snapshot(path: str, approximate: bool, cache_dir: Optional[str]) -> Tuple[str, Dict[str, Any], bool]:
+    """
+    Process pool task: statistics for one file, from the cache when its content is unchanged
+
+    Returns:
+        Tuple of (path, HeatmapStats state, whether it came from the cache)
+    """
+    cache_path = None
+    if cache_dir:
+        mode = 'approx' if approximate else 'exact'
+        cache_path = Path(cache_dir) / f"{_file_digest(Path(path))}.{mode}.v{CACHE_VERSION}.json"
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    return path, json.load(f), True
+            except (OSError, ValueError):
+                pass
+
+    state = collect_heatmap_stats(path, approximate).to_state()
+    if cache_path is not None:
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    return path, state, False
+
+
+def _expand_snapshot_paths(inputs: List[str], pattern: str = SNAPSHOT_PATTERN) -> List[Path]:
+    name_re = re.compile(pattern)
+    paths = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            paths.extend(child for child in p.iterdir() if child.is_file() and name_re.fullmatch(child.name))
+        elif any(ch in item for ch in '*?['):
+            paths.extend(Path(match) for match in glob.glob(item))
+        elif p.exists():
+            paths.append(p)
+        else:
+            print(f"Warning: not found: {item}", file=sys.stderr)
+    return sorted(set(paths))
+
+
+def analyze_snapshots(
+    inputs: List[str],
+    workers: Optional[int] = None,
+    approximate: bool = False,
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    as_json: bool = False,
+    top_n: int = DEFAULT_TOP_N,
+    pattern: str = SNAPSHOT_PATTERN
+) -> Optional[Dict[str, Any]]:
+    """
+    Readiness reports for many scrape snapshots, one process pool task per file
+    
+    Per-file statistics are cached under ``cache_dir`` by content hash, so
+    unchanged snapshots are never parsed again. The partial statistics are
+    merged into one combined report.
+    
+    Args:
+        inputs: Files, directories (files whose name matches ``pattern``) or glob patterns
+        workers: Worker processes (default: CPU count)
+        approximate: Use bounded-memory sketches
+        cache_dir: Directory for cached per-file statistics (None disables caching)
+        as_json: Print the reports as JSON instead of text
+        top_n: Number of top values listed per field
+        pattern: Regular expression a file name in a directory must fully match
+    
+    Returns:
+        {'snapshots': [per-file summaries], 'combined': combined report}, or None if no files matched
+    """
+    paths = _expand_snapshot_paths(inputs, pattern)
+    if not paths:
+        print("Error: no snapshot files found", file=sys.stderr)
+        return None
+    if cache_dir:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    combined = HeatmapStats(approximate)
+    snapshots = []
+    cached = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_analyze_snapshot, str(path), approximate, cache_dir) for path in paths]
+        for future in futures:
+            path, state, from_cache = future.result()
+            cached += from_cache
+            stats = HeatmapStats.from_state(state)
+            combined.merge(stats)
+            report = build_report(stats, top_n)
+            snapshots.append({
+                'path': path,
+                'cached': from_cache,
+                'rows': report['rows'],
+                'location_coverage_pct': report['fields']['location']['coverage_pct'],
+                'unique_locations': report['fields']['location']['unique'],
+                'missing_geo': report['missing_geo'],
+                'ready': report['ready'],
+                'aggregation_level': report['aggregation_level'],
+            })
+    elapsed = time.perf_counter() - started
+
+    result = {'snapshots': snapshots, 'combined': build_report(combined, top_n)}
+    if as_json:
+        print(json.dumps(_rounded_for_output(result), ensure_ascii=False, indent=2))
+        return result
+
+    print("="*70)
+    print(f"Snapshot Summaries ({len(paths)} files, {cached} from cache, {elapsed:.1f}s)")
+    print("="*70)
+    for snap in snapshots:
+        status = "READY" if snap['ready'] else "ISSUES"
+        print(
+            f"   {Path(snap['path']).name}: {snap['rows']} rows, "
+            f"location {snap['location_coverage_pct']:.1f}%, "
+            f"{snap['unique_locations']} unique, {status} ({snap['aggregation_level']})"
+        )
+    print()
+    print_report(result['combined'])
+    return result
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check a jobs CSV for heatmap visualization requirements')
+    parser.add_argument('csv_path', nargs='*', default=['nz_jobs_data.csv'], help='CSV file to analyze (default: nz_jobs_data.csv); with --batch, files, directories or glob patterns')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--approximate', action='store_true', help='Use HyperLogLog / space-saving sketches (bounded memory for multi-GB files)')
+    parser.add_argument('--batch', action='store_true', help='Analyze many snapshots in parallel and print per-snapshot summaries plus a combined report')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --batch (default: CPU count)')
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR, help=f'Per-file result cache for --batch, keyed by content hash (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the --batch result cache')
+    parser.add_argument('--snapshot-pattern', type=str, default=SNAPSHOT_PATTERN, help=r'Regex file names in a --batch directory must match (default: nz_jobs_\d{8}_\d{6}\.csv)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_N, help=f'Top values listed per field (default: {DEFAULT_TOP_N})')
+
+    args = parser.parse_args()
+
+    if args.batch:
+        result = analyze_snapshots(
+            args.csv_path,
+            workers=args.workers,
+            approximate=args.approximate,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            as_json=args.json,
+            top_n=args.top,
+            pattern=args.snapshot_pattern
+        )
+        if result is None:
+            sys.exit(1)
+        return
+
+    if len(args.csv_path) > 1:
+        parser.error("pass one CSV file, or use --batch for several")
+    report = analyze_csv_for_heatmap(args.csv_path[0], approximate=args.approximate, as_json=args.json, top_n=args.top)
+    if report is None:
+        sys.exit(1)
+
+
 if __name__ == "__main__":
-    analyze_csv_for_heatmap("nz_jobs_data.csv")
+    main()
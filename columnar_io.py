@@ -0,0 +1,326 @@
+"""
+Optional Parquet / Arrow Feather I/O for the job tables
+The format follows the file suffix: .parquet/.pq and .feather/.arrow use
+pyarrow with an explicit schema, anything else is the UTF-8-BOM CSV the
+scripts have always written. In the columnar formats the low-cardinality text
+columns are dictionary-encoded and salaries and coordinates are numeric, so
+files are smaller and readers can load only the columns they need. Feather
+files are memory-mapped on read
+
+pandas and pyarrow are imported on first use, so callers that only check
+is_columnar() (the scraper's CSV path) do not load either
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Bound by _require_pyarrow(); CSV still works without pyarrow
+pa = feather = pq = None
+
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+FEATHER_SUFFIXES = {".feather", ".arrow"}
+DEFAULT_COMPRESSION = "zstd"
+
+# Stored as dictionary<int32, string>: few distinct values, many rows
+DICTIONARY_COLUMNS = ("search_keyword", "city", "region", "normalized_location", "metro_city")
+# Stored as float64 (missing or unparseable values become null)
+NUMERIC_COLUMNS = ("salary_min", "salary_max", "latitude", "longitude", "metro_distance_km")
+
+
+def is_columnar(path) -> bool:
+    """Whether a path is written as Parquet or Feather rather than CSV"""
+    return Path(path).suffix.lower() in PARQUET_SUFFIXES | FEATHER_SUFFIXES
+
+
+def _require_pyarrow(path=None):
+    global pa, feather, pq
+    if pa is not None:
+        return
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError:
+        pa = None
+        target = Path(path).name if path is not None else "Parquet/Feather files"
+        raise ImportError(f"pyarrow is required for {target}: pip install pyarrow") from None
+
+
+def jobs_schema(columns: Sequence[str]):
+    """
+    Explicit Arrow schema for a job table
+
+    Args:
+        columns: Column names in file order
+
+    Returns:
+        pyarrow.Schema (every other column is a string)
+    """
+    _require_pyarrow()
+    fields = []
+    for name in columns:
+        if name in DICTIONARY_COLUMNS:
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        elif name in NUMERIC_COLUMNS:
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def to_arrow(df: pd.DataFrame, schema=None):
+    """
+    Convert a DataFrame (typically read as text) to an Arrow table
+
+    Args:
+        df: Rows to convert
+        schema: Target schema (default: jobs_schema(df.columns))
+
+    Returns:
+        pyarrow.Table with exactly the schema's columns
+    """
+    import pandas as pd
+
+    _require_pyarrow()
+    schema = schema or jobs_schema([str(c) for c in df.columns])
+    arrays = []
+    for field in schema:
+        values = df[field.name] if field.name in df.columns else pd.Series(None, index=df.index, dtype="object")
+        if pa.types.is_floating(field.type):
+            arrays.append(pa.array(pd.to_numeric(values, errors="coerce"), type=field.type, from_pandas=True))
+            continue
+        # An empty CSV field reads back as missing; store it the same way
+        values = values.where(values != "")
+        try:
+            array = pa.array(values, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed objects (numbers from a type-inferring read): stringify each
+            text = values.astype("object").where(values.notna(), None)
+            text = text.map(lambda v: v if v is None or isinstance(v, str) else str(v))
+            array = pa.array(text, type=pa.string(), from_pandas=True)
+        arrays.append(array.dictionary_encode() if pa.types.is_dictionary(field.type) else array)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _to_pandas(table) -> pd.DataFrame:
+    # Dictionary columns come back as plain strings so chunks from different
+    # files or row groups concatenate and compare like CSV text
+    decoded = pa.schema([
+        pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+        for f in table.schema
+    ])
+    return table.cast(decoded).to_pandas()
+
+
+def _read_arrow(path, columns: Optional[Sequence[str]] = None):
+    path = Path(path)
+    _require_pyarrow(path)
+    columns = list(columns) if columns is not None else None
+    if path.suffix.lower() in FEATHER_SUFFIXES:
+        return feather.read_table(path, columns=columns, memory_map=True)
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+def read_columns(path) -> List[str]:
+    """Column names of a CSV, Parquet or Feather file without reading rows"""
+    path = Path(path)
+    if not is_columnar(path):
+        import pandas as pd
+        return list(pd.read_csv(path, encoding="utf-8-sig", nrows=0).columns)
+    _require_pyarrow(path)
+    if path.suffix.lower() in FEATHER_SUFFIXES:
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).schema.names
+    return pq.read_schema(path).names
+
+
+def read_frame(path, columns: Optional[Sequence[str]] = None, dtype=str) -> pd.DataFrame:
+    """
+    Read a whole table
+
+    Args:
+        path: CSV, Parquet or Feather file
+        columns: Only these columns (None for all)
+        dtype: pandas dtype for CSV columns (columnar files keep their schema)
+
+    Returns:
+        DataFrame
+    """
+    if is_columnar(path):
+        return _to_pandas(_read_arrow(path, columns))
+    import pandas as pd
+    usecols = (lambda col: col in columns) if columns is not None else None
+    return pd.read_csv(path, encoding="utf-8-sig", dtype=dtype, usecols=usecols)
+
+
+def iter_frames(path, chunksize: int, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a table in chunks of at most ``chunksize`` rows
+
+    CSV columns are read as text, as the chunked scripts always did. Parquet
+    is read one batch at a time; Feather is memory-mapped and sliced.
+
+    Args:
+        path: CSV, Parquet or Feather file
+        chunksize: Rows per chunk
+        columns: Only these columns that exist in the file (None for all)
+
+    Yields:
+        DataFrames
+    """
+    path = Path(path)
+    if not is_columnar(path):
+        import pandas as pd
+        usecols = (lambda col: col in columns) if columns is not None else None
+        yield from pd.read_csv(path, encoding="utf-8-sig", dtype=str, usecols=usecols, chunksize=chunksize)
+        return
+
+    _require_pyarrow(path)
+    if columns is not None:
+        available = set(read_columns(path))
+        columns = [col for col in columns if col in available]
+    if path.suffix.lower() in FEATHER_SUFFIXES:
+        batches = _read_arrow(path, columns).to_batches(max_chunksize=chunksize)
+    else:
+        batches = pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunksize, columns=columns)
+    for batch in batches:
+        yield _to_pandas(pa.Table.from_batches([batch]))
+
+
+class FrameWriter:
+    """
+    Write a table one DataFrame at a time
+
+    The schema (or CSV header) is fixed by the first frame; later frames are
+    aligned to its columns. Parquet streams row groups to disk. Feather keeps
+    the (dictionary-encoded) Arrow batches in memory and writes the file on
+    close, since an Arrow file cannot change a column's dictionary between
+    batches.
+    """
+
+    def __init__(self, output_path, compression: str = DEFAULT_COMPRESSION):
+        self.output_path = Path(output_path)
+        self.compression = compression
+        self.columns: Optional[List[str]] = None
+        self.rows_written = 0
+        self._handle = None
+        self._writer = None
+        self._schema = None
+        self._tables = []
+        if is_columnar(self.output_path):
+            _require_pyarrow(self.output_path)
+
+    def write(self, df: pd.DataFrame):
+        """Append rows"""
+        if self.columns is None:
+            self.columns = [str(c) for c in df.columns]
+        else:
+            df = df.reindex(columns=self.columns)
+
+        suffix = self.output_path.suffix.lower()
+        if suffix in PARQUET_SUFFIXES:
+            self._schema = self._schema or jobs_schema(self.columns)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.output_path, self._schema, compression=self.compression)
+            self._writer.write_table(to_arrow(df, self._schema))
+        elif suffix in FEATHER_SUFFIXES:
+            self._schema = self._schema or jobs_schema(self.columns)
+            self._tables.append(to_arrow(df, self._schema))
+        else:
+            if self._handle is None:
+                self._handle = self.output_path.open("w", newline="", encoding="utf-8-sig")
+                df.to_csv(self._handle, index=False)
+            else:
+                df.to_csv(self._handle, index=False, header=False)
+        self.rows_written += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self.output_path.suffix.lower() in FEATHER_SUFFIXES and (self._tables or self.columns is not None):
+            table = pa.concat_tables(self._tables).unify_dictionaries().combine_chunks()
+            feather.write_feather(table, self.output_path, compression=self.compression)
+            self._tables = []
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_frame(df: pd.DataFrame, output_path, compression: str = DEFAULT_COMPRESSION):
+    """Write a whole DataFrame as CSV, Parquet or Feather by suffix"""
+    with FrameWriter(output_path, compression) as writer:
+        writer.write(df)
+
+
+def append_frame(df: pd.DataFrame, output_path):
+    """
+    Append rows to an existing table (or create it)
+
+    CSV is appended in place. Parquet and Feather files cannot be appended
+    to, so the existing rows are rewritten with the new ones into a
+    temporary file that replaces the output.
+    """
+    output_path = Path(output_path)
+    if not is_columnar(output_path):
+        append = output_path.exists()
+        with output_path.open("a" if append else "w", newline="", encoding="utf-8-sig") as handle:
+            df.to_csv(handle, index=False, header=not append)
+        return
+
+    tmp_path = output_path.with_name(output_path.name + ".tmp" + output_path.suffix)
+    with FrameWriter(tmp_path) as writer:
+        if output_path.exists():
+            for chunk in iter_frames(output_path, 100_000):
+                writer.write(chunk)
+        writer.write(df)
+    os.replace(tmp_path, output_path)
+
+
+def convert(input_path, output_path, chunksize: int = 100_000) -> int:
+    """
+    Copy a table between CSV, Parquet and Feather (formats from the suffixes)
+
+    Returns:
+        Number of rows written
+    """
+    with FrameWriter(output_path) as writer:
+        for chunk in iter_frames(input_path, chunksize):
+            writer.write(chunk)
+    return writer.rows_written
+
+
+def main():
+    """Main function"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Convert a job table between CSV, Parquet and Feather')
+    parser.add_argument('input', type=str, help='Input file (.csv, .parquet or .feather)')
+    parser.add_argument('output', type=str, help='Output file; the format follows the suffix')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Rows per chunk (default: 100000)')
+
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = convert(args.input, args.output, args.chunksize)
+    before = os.path.getsize(args.input)
+    after = os.path.getsize(args.output)
+    print(f"Wrote {rows} rows to {args.output} in {time.perf_counter() - started:.2f}s")
+    print(f"Size: {before / 1024:.1f} KB -> {after / 1024:.1f} KB ({after / max(before, 1):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,81 +1,18 @@
-import csv
-import re
+from __future__ import annotations
 
+import csv
 
-CSV_PATH = r"d:\Projects\R+Python\R_Python_Data_Visualization_Web\nz_jobs_data_with_coords.csv"
+from location_normalizer import metro_city
+from metro_assigner import MetroIndex
 
 
-MANUAL = {
-    "Auckland CBD": "Auckland",
-    "Grey Lynn": "Auckland",
-    "Albany": "Auckland",
-    "Mount Eden": "Auckland",
-    "Mount Wellington": "Auckland",
-    "Wellington Central": "Wellington",
-    "Petone": "Wellington",
-    "Lower Hutt": "Wellington",
-    "Christchurch Central": "Christchurch",
-    "Addington": "Christchurch",
-    "Palmerston North Central": "Palmerston North",
-    "North Dunedin": "Dunedin",
-    "Taupo Central": "Taupo",
-    "Hamilton Lake": "Hamilton",
-    "Te Rapa": "Hamilton",
-}
-
-PAT_AKL = re.compile(
-    r"grey lynn|ponsonby|takapuna|newmarket|remuera|epsom|parnell|grafton|ellerslie|penrose|onehunga|avondale|mt albert|mount albert|new lynn|henderson|glenfield|rosedale|manukau|papatoetoe|howick|east tamaki|mount roskill|mt roskill|devonport|browns bay|mount wellington|mt wellington",
-    re.I,
-)
-PAT_WLG = re.compile(
-    r"lower hutt|upper hutt|petone|porirua|johnsonville|thorndon|te aro|newtown|kilbirnie|miramar",
-    re.I,
-)
-PAT_HAM = re.compile(
-    r"hamilton lake|hamilton east|te rapa|chartwell|rototuna|frankton|claudelands|hillcrest|dinsdale",
-    re.I,
-)
-PAT_CHC = re.compile(
-    r"addington|riccarton|hornby|sydenham|ilam|fendalton|papanui|linwood|wigram|halswell",
-    re.I,
-)
+CSV_PATH = r"d:\Projects\R+Python\R_Python_Data_Visualization_Web\nz_jobs_data_with_coords.csv"
 
 
 def normalize_city(v: str | None) -> str | None:
     if v is None:
         return None
-    v = str(v).strip()
-    if not v:
-        return None
-    if v in MANUAL:
-        return MANUAL[v]
-    if PAT_AKL.search(v):
-        return "Auckland"
-    if PAT_WLG.search(v):
-        return "Wellington"
-    if PAT_HAM.search(v):
-        return "Hamilton"
-    if PAT_CHC.search(v):
-        return "Christchurch"
-
-    lv = v.lower()
-    if "auckland" in lv:
-        return "Auckland"
-    if "wellington" in lv:
-        return "Wellington"
-    if "christchurch" in lv:
-        return "Christchurch"
-    if "hamilton" in lv:
-        return "Hamilton"
-    if "dunedin" in lv:
-        return "Dunedin"
-    if "taupo" in lv:
-        return "Taupo"
-    if "nelson" in lv:
-        return "Nelson"
-    if "napier" in lv:
-        return "Napier"
-    return v
+    return metro_city(str(v)) or None
 
 
 def main() -> None:
@@ -83,6 +20,7 @@ def main() -> None:
     raw_vals: set[str] = set()
     coords: dict[str | None, dict[str, float]] = {}
     coords_n: dict[str | None, int] = {}
+    located: list[tuple[str, str | None, float, float]] = []
 
     with open(CSV_PATH, "r", encoding="utf-8-sig", newline="") as f:
         reader = csv.DictReader(f)
@@ -104,6 +42,7 @@ def main() -> None:
                 acc["lat_sum"] += lat
                 acc["lon_sum"] += lon
                 coords_n[city] = coords_n.get(city, 0) + 1
+                located.append((raw, city, lat, lon))
 
     raw_vals = {v for v in raw_vals if v}
     print("distinct raw_location:", len(raw_vals))
@@ -120,6 +59,27 @@ def main() -> None:
         lon = coords[k]["lon_sum"] / n
         print(f"{k}: n={n} lat={lat:.5f} lon={lon:.5f}")
 
+    if not located:
+        return
+    metros, distance_km = MetroIndex().assign(
+        [row[2] for row in located], [row[3] for row in located]
+    )
+    metro_counts: dict[str, int] = {}
+    disagreements: dict[tuple[str, str | None, str], int] = {}
+    for (raw, city, _, _), metro in zip(located, metros):
+        metro_counts[metro] = metro_counts.get(metro, 0) + 1
+        if metro and metro != city:
+            key = (raw, city, metro)
+            disagreements[key] = disagreements.get(key, 0) + 1
+
+    print("\nNearest metro by coordinates:")
+    for k, v in sorted(metro_counts.items(), key=lambda kv: kv[1], reverse=True):
+        print(f"{k or '(outside every metro radius)'}: {v}")
+
+    print(f"\nRows where name mapping and nearest metro disagree: {sum(disagreements.values())}")
+    for (raw, city, metro), v in sorted(disagreements.items(), key=lambda kv: kv[1], reverse=True)[:30]:
+        print(f"{raw!r}: name -> {city}, coordinates -> {metro} ({v} rows)")
+
 
 if __name__ == "__main__":
     main()
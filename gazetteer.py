@@ -0,0 +1,144 @@
+"""
+Offline NZ gazetteer: resolve place names to coordinates without a network call.
+"""
+from __future__ import annotations
+
+import bisect
+import csv
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+
+DEFAULT_PLACES = "nz_places.csv"
+DEFAULT_MIN_SIMILARITY = 0.75
+MIN_PREFIX_LENGTH = 4
+
+_ABBREVIATIONS = [
+    (re.compile(r"\bmt\b"), "mount"),
+    (re.compile(r"\bst\b"), "saint"),
+]
+
+
+def place_key(name: str) -> str:
+    """Case-, accent- and whitespace-insensitive key: "Mt  Eden" -> "mount eden"."""
+    value = unicodedata.normalize("NFKD", name)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    value = re.sub(r"[^\w\s']", " ", value.casefold())
+    for pattern, replacement in _ABBREVIATIONS:
+        value = pattern.sub(replacement, value)
+    return " ".join(value.split())
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """Place names indexed by exact key, sorted prefix and character trigrams."""
+
+    def __init__(self) -> None:
+        self._places: Dict[str, Tuple[str, float, float]] = {}
+        self._sorted_keys: List[str] = []
+        self._trigram_index: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def add(self, name: str, latitude: float, longitude: float) -> None:
+        key = place_key(name)
+        if not key or key in self._places:
+            return
+        self._places[key] = (name, float(latitude), float(longitude))
+        bisect.insort(self._sorted_keys, key)
+        for gram in _trigrams(key):
+            self._trigram_index.setdefault(gram, set()).add(key)
+
+    def add_many(self, places: Iterable[Tuple[str, float, float]]) -> int:
+        before = len(self)
+        for name, latitude, longitude in places:
+            self.add(name, latitude, longitude)
+        return len(self) - before
+
+    def load_csv(self, path: Path) -> int:
+        """Import a place list with name, latitude and longitude columns."""
+        path = Path(path)
+        if not path.exists():
+            return 0
+        with path.open("r", newline="", encoding="utf-8-sig") as handle:
+            return self.add_many(
+                (row["name"], float(row["latitude"]), float(row["longitude"]))
+                for row in csv.DictReader(handle)
+                if row.get("name") and row.get("latitude") and row.get("longitude")
+            )
+
+    def load_cache(self, cache: Mapping[str, Mapping[str, Optional[float]]]) -> int:
+        """Import the successful entries of a geocode cache."""
+        return self.add_many(
+            (location, coords["latitude"], coords["longitude"])
+            for location, coords in cache.items()
+            if coords.get("latitude") is not None and coords.get("longitude") is not None
+        )
+
+    def _exact(self, key: str) -> Optional[str]:
+        return key if key in self._places else None
+
+    def _prefix(self, key: str) -> Optional[str]:
+        if len(key) < MIN_PREFIX_LENGTH:
+            return None
+        start = bisect.bisect_left(self._sorted_keys, key)
+        matches = []
+        for candidate in self._sorted_keys[start:]:
+            if not candidate.startswith(key):
+                break
+            matches.append(candidate)
+        # The shortest completion is the most general place ("palmerston n" -> "palmerston north")
+        return min(matches, key=len) if matches else None
+
+    def _fuzzy(self, key: str, min_similarity: float) -> Optional[str]:
+        grams = _trigrams(key)
+        overlap: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._trigram_index.get(gram, ()):
+                overlap[candidate] = overlap.get(candidate, 0) + 1
+        best, best_score = None, min_similarity
+        for candidate, shared in overlap.items():
+            # Dice coefficient over trigram sets
+            score = 2 * shared / (len(grams) + len(_trigrams(candidate)))
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def lookup(self, location: str, min_similarity: float = DEFAULT_MIN_SIMILARITY) -> Optional[Dict[str, float]]:
+        """Resolve a location, trying the whole value then each comma-separated part."""
+        if not location:
+            return None
+        parts = [location] + [part for part in location.split(",") if part.strip()]
+        keys = [key for key in (place_key(part) for part in parts) if key]
+        for match in (self._exact, self._prefix):
+            for key in keys:
+                found = match(key)
+                if found:
+                    return self._coords(found)
+        for key in keys:
+            found = self._fuzzy(key, min_similarity)
+            if found:
+                return self._coords(found)
+        return None
+
+    def _coords(self, key: str) -> Dict[str, float]:
+        _, latitude, longitude = self._places[key]
+        return {"latitude": latitude, "longitude": longitude}
+
+
+def build_gazetteer(
+    places_path: Optional[Path] = None,
+    cache: Optional[Mapping[str, Mapping[str, Optional[float]]]] = None,
+) -> Gazetteer:
+    gazetteer = Gazetteer()
+    gazetteer.load_csv(places_path or Path(__file__).parent / DEFAULT_PLACES)
+    if cache is not None:
+        gazetteer.load_cache(cache)
+    return gazetteer
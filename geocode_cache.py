@@ -0,0 +1,152 @@
+"""
+SQLite-backed geocode cache for add_coordinates.py.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+
+SQLITE_SUFFIXES = {".sqlite", ".sqlite3", ".db"}
+DEFAULT_NEGATIVE_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_BATCH_SIZE = 100
+
+
+def is_sqlite_cache(cache_path: Path) -> bool:
+    return Path(cache_path).suffix.lower() in SQLITE_SUFFIXES
+
+
+class SqliteGeocodeCache(MutableMapping):
+    """Dict-like geocode cache: location -> {"latitude", "longitude"}.
+
+    Failed lookups (null coordinates) expire after ``negative_ttl_seconds`` so
+    they are retried, and writes are committed every ``batch_size`` entries.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.path = Path(path)
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.batch_size = max(1, batch_size)
+        self._pending = 0
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS geocode (
+                location TEXT PRIMARY KEY,
+                latitude REAL,
+                longitude REAL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _is_expired(self, latitude: Optional[float], longitude: Optional[float], updated_at: float) -> bool:
+        if latitude is not None and longitude is not None:
+            return False
+        return time.time() - updated_at > self.negative_ttl_seconds
+
+    def __getitem__(self, location: str) -> Dict[str, Optional[float]]:
+        row = self._conn.execute(
+            "SELECT latitude, longitude, updated_at FROM geocode WHERE location = ?",
+            (location,),
+        ).fetchone()
+        if row is None or self._is_expired(*row):
+            raise KeyError(location)
+        return {"latitude": row[0], "longitude": row[1]}
+
+    def __setitem__(self, location: str, coords: Dict[str, Optional[float]]) -> None:
+        self.put(location, coords.get("latitude"), coords.get("longitude"))
+
+    def __delitem__(self, location: str) -> None:
+        cursor = self._conn.execute("DELETE FROM geocode WHERE location = ?", (location,))
+        if cursor.rowcount == 0:
+            raise KeyError(location)
+        self._mark_pending()
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._conn.execute(
+            "SELECT location, latitude, longitude, updated_at FROM geocode"
+        ).fetchall()
+        return iter([row[0] for row in rows if not self._is_expired(*row[1:])])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def put(
+        self,
+        location: str,
+        latitude: Optional[float],
+        longitude: Optional[float],
+        updated_at: Optional[float] = None,
+    ) -> None:
+        self._conn.execute(
+            """
+            INSERT INTO geocode (location, latitude, longitude, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(location) DO UPDATE SET
+                latitude = excluded.latitude,
+                longitude = excluded.longitude,
+                updated_at = excluded.updated_at
+            """,
+            (location, latitude, longitude, time.time() if updated_at is None else updated_at),
+        )
+        self._mark_pending()
+
+    def _mark_pending(self) -> None:
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.commit()
+
+    def import_json(self, json_path: Path) -> int:
+        """Import a legacy JSON cache once; entries already in SQLite win."""
+        json_path = Path(json_path)
+        key = f"imported:{json_path.resolve()}"
+        if not json_path.exists():
+            return 0
+        if self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+            return 0
+
+        with json_path.open("r", encoding="utf-8") as handle:
+            entries = json.load(handle)
+        # The JSON file has no per-entry timestamps; its mtime is the best guess.
+        imported_at = json_path.stat().st_mtime
+        cursor = self._conn.executemany(
+            "INSERT OR IGNORE INTO geocode (location, latitude, longitude, updated_at) VALUES (?, ?, ?, ?)",
+            [
+                (location, coords.get("latitude"), coords.get("longitude"), imported_at)
+                for location, coords in entries.items()
+            ],
+        )
+        self._conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, str(time.time())))
+        self.commit()
+        return cursor.rowcount
+
+    def commit(self) -> None:
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self) -> "SqliteGeocodeCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,245 @@
+"""
+Location normalization shared by the scraper and the CSV tools
+All rules live in the data tables below. Suburb and city lookups use one
+compiled regex per rule set, built as a character trie so the cost per value
+does not grow with the number of suburbs; suffixes are stripped in a single
+ordered pass like the original scripts. Results are memoized in a bounded LRU
+cache
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+
+# Trailing words dropped from scraped city names ("Auckland CBD" -> "Auckland").
+# Checked once each, in this order, so "Timaru Central North" -> "Timaru Central"
+LOCATION_SUFFIXES = [
+    " cbd", " CBD",
+    " central", " Central", " CENTRAL",
+    " north", " North", " NORTH",
+    " south", " South", " SOUTH",
+    " east", " East", " EAST",
+    " west", " West", " WEST",
+]
+
+# Names that end in a suffix word but are a different place without it
+PROTECTED_NAMES = ["Palmerston North"]
+
+# Exact aliases for the same place
+LOCATION_ALIASES = {
+    "Auckland CBD": "Auckland",
+    "Wellington Central": "Wellington",
+    "Christchurch Central": "Christchurch",
+    "Palmerston North Central": "Palmerston North",
+    "Taupo Central": "Taupo",
+    "North Dunedin": "Dunedin",
+    "Mount Eden": "Auckland",
+}
+
+# Exact names aggregated to a city at city level (the manual map in
+# normalize_city(), R/utils/location_utils.R). Matched on the whole value only,
+# so "Albany, Hamilton" is not pulled into Auckland
+METRO_ALIASES = {
+    **LOCATION_ALIASES,
+    "Grey Lynn": "Auckland",
+    "Albany": "Auckland",
+    "Mount Wellington": "Auckland",
+    "Kelburn": "Wellington",
+    "Mount Victoria": "Wellington",
+    "Petone": "Wellington",
+    "Lower Hutt": "Wellington",
+    "Addington": "Christchurch",
+    "Hamilton Lake": "Hamilton",
+    "Te Rapa": "Hamilton",
+}
+
+# Suburbs aggregated to their city at city level (same lists as R/utils/location_utils.R)
+METRO_SUBURBS = {
+    "Auckland": [
+        "grey lynn", "ponsonby", "takapuna", "newmarket", "remuera", "epsom", "parnell",
+        "grafton", "ellerslie", "penrose", "onehunga", "avondale", "mt albert", "mount albert",
+        "new lynn", "henderson", "glenfield", "rosedale", "manukau", "papatoetoe", "howick",
+        "east tamaki", "mount roskill", "mt roskill", "devonport", "browns bay",
+        "mount wellington", "mt wellington",
+    ],
+    "Wellington": [
+        "kelburn", "mount victoria", "lower hutt", "upper hutt", "petone", "porirua",
+        "johnsonville", "thorndon", "te aro", "newtown", "kilbirnie", "miramar",
+    ],
+    "Hamilton": [
+        "hamilton lake", "hamilton east", "te rapa", "chartwell", "rototuna", "frankton",
+        "claudelands", "hillcrest", "dinsdale",
+    ],
+    "Christchurch": [
+        "addington", "riccarton", "hornby", "sydenham", "ilam", "fendalton", "papanui",
+        "linwood", "wigram", "halswell",
+    ],
+}
+
+# City names matched anywhere in a value, in priority order
+METRO_CITIES = ["Auckland", "Wellington", "Christchurch", "Hamilton", "Dunedin", "Taupo", "Nelson", "Napier"]
+
+# Cities collapsed before geocoding; other places are geocoded as they are
+GEOCODE_CITIES = ["Auckland", "Wellington", "Christchurch", "Dunedin"]
+
+DEFAULT_CACHE_SIZE = 65536
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Build a regex alternation factored as a character trie
+
+    ``["te aro", "te rapa"]`` becomes ``te\\ (?:aro|rapa)``. At each position
+    the regex engine only follows the branch for the next character, instead
+    of trying every term in turn. Longer terms are preferred over their prefixes.
+
+    Args:
+        terms: Literal terms to match
+
+    Returns:
+        Regex pattern source
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        is_end = '' in node
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if is_end else group
+
+    return emit(trie) if trie else '(?!)'
+
+
+class _TermMatcher:
+    """One compiled trie regex over ranked terms; the best-ranked match wins"""
+
+    def __init__(self, targets: Mapping[str, Tuple[int, str]]):
+        self.targets = dict(targets)
+        self.regex = re.compile(_trie_pattern(self.targets))
+
+    def match(self, value: str) -> Optional[str]:
+        best: Optional[Tuple[int, str]] = None
+        for m in self.regex.finditer(value.casefold()):
+            target = self.targets[m.group(0)]
+            if best is None or target[0] < best[0]:
+                best = target
+        return best[1] if best else None
+
+
+class LocationNormalizer:
+    """
+    Table-driven location normalization with memoized lookups
+
+    Three views of a raw location are offered:
+    - clean(): drop trailing CBD/Central/North/... words (scraped city names)
+    - geocode_name(): aliases plus the major cities, keeping suburbs for geocoding
+    - metro(): exact metro aliases, suburbs -> city, then city names (city-level aggregation)
+    """
+
+    def __init__(
+        self,
+        aliases: Mapping[str, str] = LOCATION_ALIASES,
+        metro_aliases: Mapping[str, str] = METRO_ALIASES,
+        metro_suburbs: Mapping[str, Sequence[str]] = METRO_SUBURBS,
+        metro_cities: Sequence[str] = METRO_CITIES,
+        geocode_cities: Sequence[str] = GEOCODE_CITIES,
+        suffixes: Sequence[str] = LOCATION_SUFFIXES,
+        protected_names: Sequence[str] = PROTECTED_NAMES,
+        cache_size: int = DEFAULT_CACHE_SIZE
+    ):
+        self._aliases = {name.casefold(): target for name, target in aliases.items()}
+        self._metro_aliases = {name.casefold(): target for name, target in metro_aliases.items()}
+        self._protected = {name.casefold() for name in protected_names}
+        self._suffixes = tuple(suffixes)
+
+        # Suburbs outrank city names, as in the old sequential checks
+        metro_targets: Dict[str, Tuple[int, str]] = {}
+        for rank, (city, suburbs) in enumerate(metro_suburbs.items()):
+            for suburb in suburbs:
+                metro_targets.setdefault(suburb.casefold(), (rank, city))
+        for rank, city in enumerate(metro_cities, start=len(metro_suburbs)):
+            metro_targets.setdefault(city.casefold(), (rank, city))
+        self._metro = _TermMatcher(metro_targets)
+        self._geocode = _TermMatcher({city.casefold(): (rank, city) for rank, city in enumerate(geocode_cities)})
+
+        self.clean: Callable[[str], str] = lru_cache(maxsize=cache_size)(self._clean)
+        self.metro: Callable[[str], str] = lru_cache(maxsize=cache_size)(self._metro_city)
+        self.geocode_name: Callable[[str], str] = lru_cache(maxsize=cache_size)(self._geocode_name)
+
+    def _clean(self, name: str) -> str:
+        if not name:
+            return ""
+        normalized = name.strip()
+        for suffix in self._suffixes:
+            if normalized.casefold() in self._protected:
+                break
+            if normalized.endswith(suffix):
+                normalized = normalized[:-len(suffix)].strip()
+        return normalized
+
+    def _metro_city(self, value: str) -> str:
+        value = (value or "").strip()
+        if not value:
+            return ""
+        alias = self._metro_aliases.get(value.casefold())
+        if alias:
+            return alias
+        return self._metro.match(value) or value
+
+    def _geocode_name(self, value: str) -> str:
+        value = (value or "").strip()
+        alias = self._aliases.get(value.casefold())
+        if alias:
+            return alias
+        return self._geocode.match(value) or value
+
+    def map_series(self, values, normalize: Callable[[str], str]):
+        """
+        Apply a normalization once per distinct value of a pandas Series
+
+        Args:
+            values: Series of raw values (missing values become "")
+            normalize: One of clean, metro or geocode_name
+
+        Returns:
+            pandas Categorical aligned with ``values``
+        """
+        import pandas as pd
+
+        codes, uniques = pd.factorize(values)
+        # Missing values get code -1, which picks the trailing ""
+        normalized = [normalize(value) for value in uniques] + [""]
+        normalized_codes, categories = pd.factorize(pd.Index(normalized))
+        return pd.Categorical.from_codes(normalized_codes[codes], categories=categories)
+
+
+DEFAULT_NORMALIZER = LocationNormalizer()
+
+
+def clean_city_name(name: str) -> str:
+    """Drop trailing CBD/Central/North/... words from a city name"""
+    return DEFAULT_NORMALIZER.clean(name)
+
+
+def geocode_name(value: str) -> str:
+    """Location to send to the geocoder (aliases and major cities collapsed)"""
+    return DEFAULT_NORMALIZER.geocode_name(value)
+
+
+def metro_city(value: str) -> str:
+    """City a location aggregates to ("" for blank values)"""
+    return DEFAULT_NORMALIZER.metro(value)
+
+
+def normalize_series(values, normalize: Callable[[str], str] = geocode_name):
+    """Vectorized normalization of a pandas Series, see LocationNormalizer.map_series"""
+    return DEFAULT_NORMALIZER.map_series(values, normalize)
@@ -0,0 +1,210 @@
+"""
+Assign coordinates to their nearest NZ metro area
+Builds a KD-tree over metro centroids (points on the unit sphere, so chord
+distances order the same way as great-circle distances) and assigns rows in
+vectorized batches. Any suburb with coordinates maps to a city, whether or not
+it is listed in the location_normalizer suburb table
+"""
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    # Brute force over the (few) centroids is used instead
+    cKDTree = None
+
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 25.0
+DEFAULT_BATCH_SIZE = 1_000_000
+
+# name, latitude, longitude, radius_km (None uses the default radius)
+METRO_CENTROIDS: List[Tuple[str, float, float, Optional[float]]] = [
+    ("Auckland", -36.8485, 174.7633, 45.0),
+    ("Wellington", -41.2865, 174.7762, 35.0),
+    ("Christchurch", -43.5321, 172.6362, 30.0),
+    ("Hamilton", -37.7870, 175.2793, None),
+    ("Tauranga", -37.6878, 176.1651, None),
+    ("Dunedin", -45.8788, 170.5028, None),
+    ("Palmerston North", -40.3523, 175.6082, None),
+    ("Napier", -39.4928, 176.9120, 15.0),
+    ("Hastings", -39.6381, 176.8492, 15.0),
+    ("Nelson", -41.2706, 173.2840, None),
+    ("Rotorua", -38.1368, 176.2497, None),
+    ("New Plymouth", -39.0556, 174.0752, None),
+    ("Whangarei", -35.7251, 174.3237, None),
+    ("Invercargill", -46.4132, 168.3538, None),
+    ("Whanganui", -39.9301, 175.0479, None),
+    ("Gisborne", -38.6623, 178.0176, None),
+    ("Queenstown", -45.0312, 168.6626, None),
+    ("Taupo", -38.6857, 176.0702, None),
+    ("Blenheim", -41.5134, 173.9612, None),
+    ("Timaru", -44.3970, 171.2550, None),
+]
+
+
+def _to_unit_xyz(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
+
+
+def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+class MetroIndex:
+    """Nearest-metro lookup over a fixed set of centroids"""
+
+    def __init__(
+        self,
+        centroids: Sequence[Tuple[str, float, float, Optional[float]]] = METRO_CENTROIDS,
+        radius_km: float = DEFAULT_RADIUS_KM
+    ):
+        self.names = np.array([c[0] for c in centroids] + [""], dtype=object)
+        self.radius_km = np.array([c[3] if c[3] is not None else radius_km for c in centroids], dtype=np.float64)
+        self._points = _to_unit_xyz(
+            np.array([c[1] for c in centroids], dtype=np.float64),
+            np.array([c[2] for c in centroids], dtype=np.float64),
+        )
+        self._tree = cKDTree(self._points) if cKDTree is not None else None
+
+    def _nearest(self, xyz: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self._tree is not None:
+            chord, index = self._tree.query(xyz, k=1)
+            return chord, index
+        # (rows, metros) squared distances; the centroid list is short
+        d2 = ((xyz[:, None, :] - self._points[None, :, :]) ** 2).sum(axis=2)
+        index = d2.argmin(axis=1)
+        return np.sqrt(d2[np.arange(len(index)), index]), index
+
+    def assign_codes(
+        self,
+        lat,
+        lon,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest metro per coordinate pair
+
+        Args:
+            lat: Latitudes (NaN for unknown)
+            lon: Longitudes (NaN for unknown)
+            batch_size: Rows per KD-tree query
+
+        Returns:
+            Tuple of (metro codes into self.names, -1 when unknown or out of
+            radius; distance to the nearest metro in km, NaN when unknown)
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        codes = np.full(len(lat), -1, dtype=np.int64)
+        distance_km = np.full(len(lat), np.nan)
+        for start in range(0, len(lat), batch_size):
+            stop = start + batch_size
+            valid = np.flatnonzero(~(np.isnan(lat[start:stop]) | np.isnan(lon[start:stop]))) + start
+            if not len(valid):
+                continue
+            chord, index = self._nearest(_to_unit_xyz(lat[valid], lon[valid]))
+            km = _chord_to_km(chord)
+            distance_km[valid] = km
+            codes[valid] = np.where(km <= self.radius_km[index], index, -1)
+        return codes, distance_km
+
+    def assign(self, lat, lon, batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Like assign_codes, but returns metro names ("" outside every radius)
+        """
+        codes, distance_km = self.assign_codes(lat, lon, batch_size)
+        # Code -1 picks the trailing ""
+        return self.names[codes], distance_km
+
+
+def annotate_csv(
+    input_path: Path,
+    output_path: Path,
+    radius_km: float = DEFAULT_RADIUS_KM,
+    chunksize: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """
+    Add metro_city and metro_distance_km columns to a CSV with latitude/longitude
+
+    Args:
+        input_path: CSV written by add_coordinates.py
+        output_path: Annotated CSV path
+        radius_km: Default metro radius
+        chunksize: Rows read and assigned per batch
+
+    Returns:
+        Number of rows written
+    """
+    import pandas as pd
+
+    index = MetroIndex(radius_km=radius_km)
+    rows = 0
+    chunks = pd.read_csv(input_path, encoding="utf-8-sig", dtype=str, chunksize=chunksize)
+    with open(output_path, "w", newline="", encoding="utf-8-sig") as handle:
+        for i, chunk in enumerate(chunks):
+            lat = pd.to_numeric(chunk["latitude"], errors="coerce").to_numpy()
+            lon = pd.to_numeric(chunk["longitude"], errors="coerce").to_numpy()
+            names, distance_km = index.assign(lat, lon)
+            chunk["metro_city"] = names
+            chunk["metro_distance_km"] = np.round(distance_km, 2)
+            chunk.to_csv(handle, index=False, header=(i == 0))
+            rows += len(chunk)
+    return rows
+
+
+def benchmark(rows: int, radius_km: float = DEFAULT_RADIUS_KM) -> float:
+    """
+    Time assignment of random NZ coordinates
+
+    Args:
+        rows: Number of coordinate pairs
+        radius_km: Default metro radius
+
+    Returns:
+        Rows per second
+    """
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-46.6, -34.4, rows)
+    lon = rng.uniform(166.4, 178.6, rows)
+    index = MetroIndex(radius_km=radius_km)
+    started = time.perf_counter()
+    index.assign_codes(lat, lon)
+    return rows / (time.perf_counter() - started)
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Assign rows to their nearest NZ metro area by coordinates')
+    parser.add_argument('--input', type=str, default='nz_jobs_data_with_coords.csv', help='CSV with latitude/longitude columns (default: nz_jobs_data_with_coords.csv)')
+    parser.add_argument('--output', type=str, default=None, help='Output CSV path (default: overwrite input)')
+    parser.add_argument('--radius-km', type=float, default=DEFAULT_RADIUS_KM, help=f'Default metro radius in km (default: {DEFAULT_RADIUS_KM:g})')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_BATCH_SIZE, help=f'Rows per batch (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--benchmark', type=int, default=None, metavar='ROWS', help='Time assignment of ROWS random coordinates instead')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        engine = "cKDTree" if cKDTree is not None else "numpy brute force"
+        print(f"Assigned {args.benchmark:,} rows at {benchmark(args.benchmark, args.radius_km):,.0f} rows/s ({engine})")
+        return
+
+    input_path = Path(args.input)
+    output_path = Path(args.output) if args.output else input_path
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    rows = annotate_csv(input_path, tmp_path, args.radius_km, args.chunksize)
+    tmp_path.replace(output_path)
+    print(f"Assigned metros for {rows} rows: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
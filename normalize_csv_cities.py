@@ -3,63 +3,130 @@ Normalize city names in existing CSV file
 Removes suffixes like CBD, Central, etc. from city/location/region fields
 """
 import csv
+import os
+import shutil
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
+from columnar_io import FrameWriter, is_columnar, iter_frames, read_columns
+from location_normalizer import clean_city_name as normalize_city_name
+from stream_sketches import DistinctCounter, distinct_counter
 
-def normalize_city_name(city_name: str) -> str:
+
+GEO_FIELDS = ['location', 'city', 'region']
+FRAME_CHUNKSIZE = 100_000
+
+
+def _make_backup(input_path: Path, backup_path: Path) -> str:
     """
-    Normalize city name by removing common suffixes like CBD, Central, etc.
+    Keep the original file at backup_path without copying it when possible
     
-    Args:
-        city_name: Raw city name from CSV data
+    A hard link shares the original file's data. The normalized file is
+    written to a new file and renamed over the input, so the link keeps the
+    original contents.
+    
+    Returns:
+        How the backup was made ("hard link" or "copy")
+    """
+    if backup_path.exists():
+        backup_path.unlink()
+    try:
+        os.link(input_path, backup_path)
+        return "hard link"
+    except OSError:
+        shutil.copy2(input_path, backup_path)
+        return "copy"
+
+
+Counters = Dict[str, DistinctCounter]
+
+
+def _normalize_rows(input_path: Path, tmp_path: Path, approximate: bool) -> Tuple[int, int, List[str], Counters, Counters]:
+    """
+    CSV to CSV: stream rows with the csv module, leaving other fields untouched
+    
+    Returns:
+        Tuple of (rows, changed values, normalized fields, unique values before, after)
+    """
+    normalized_count = 0
+    row_count = 0
+    with open(input_path, 'r', newline='', encoding='utf-8-sig') as f, \
+            open(tmp_path, 'w', newline='', encoding='utf-8-sig') as out:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        fields = [field for field in GEO_FIELDS if field in fieldnames]
+        unique_before = {field: distinct_counter(approximate) for field in fields}
+        unique_after = {field: distinct_counter(approximate) for field in fields}
+        
+        writer = csv.DictWriter(out, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in reader:
+            row_count += 1
+            for field in fields:
+                original = row[field]
+                if not original:
+                    continue
+                normalized = normalize_city_name(original)
+                unique_before[field].add(original)
+                if normalized:
+                    unique_after[field].add(normalized)
+                if original != normalized:
+                    row[field] = normalized
+                    normalized_count += 1
+            writer.writerow(row)
+    return row_count, normalized_count, fields, unique_before, unique_after
+
+
+def _normalize_frames(input_path: Path, tmp_path: Path, approximate: bool) -> Tuple[int, int, List[str], Counters, Counters]:
+    """
+    Parquet/Feather (either side): normalize each chunk once per distinct value
     
     Returns:
-        Normalized city name
+        Same as _normalize_rows
     """
-    if not city_name:
-        return ""
-    
-    # Common suffixes to remove (case insensitive)
-    suffixes_to_remove = [
-        " cbd",
-        " CBD",
-        " central",
-        " Central",
-        " CENTRAL",
-        " north",
-        " North",
-        " NORTH",
-        " south",
-        " South",
-        " SOUTH",
-        " east",
-        " East",
-        " EAST",
-        " west",
-        " West",
-        " WEST"
-    ]
-    
-    normalized = city_name.strip()
-    
-    # Remove suffixes
-    for suffix in suffixes_to_remove:
-        if normalized.endswith(suffix):
-            normalized = normalized[:-len(suffix)].strip()
-    
-    return normalized
-
-
-def normalize_csv_cities(input_csv: str, output_csv: Optional[str] = None, backup: bool = True):
+    import numpy as np
+    import pandas as pd
+    
+    normalized_count = 0
+    row_count = 0
+    fields = [field for field in GEO_FIELDS if field in read_columns(input_path)]
+    unique_before = {field: distinct_counter(approximate) for field in fields}
+    unique_after = {field: distinct_counter(approximate) for field in fields}
+    
+    with FrameWriter(tmp_path) as writer:
+        for chunk in iter_frames(input_path, FRAME_CHUNKSIZE):
+            row_count += len(chunk)
+            for field in fields:
+                values = chunk[field]
+                present = values.notna() & (values != '')
+                codes, uniques = pd.factorize(values[present])
+                uniques = list(uniques)
+                cleaned = np.array([normalize_city_name(value) for value in uniques] + [''], dtype=object)
+                changed = np.array([original != normalized for original, normalized in zip(uniques, cleaned)] + [False])
+                unique_before[field].update(uniques)
+                unique_after[field].update(value for value in cleaned if value)
+                normalized_count += int(changed[codes].sum())
+                chunk.loc[present, field] = cleaned[codes]
+            writer.write(chunk)
+    return row_count, normalized_count, fields, unique_before, unique_after
+
+
+def normalize_csv_cities(input_csv: str, output_csv: Optional[str] = None, backup: bool = True, approximate: bool = False):
     """
     Normalize city names in CSV file
     
+    Rows are streamed from the input to a temporary file that is renamed over
+    the output, so memory does not depend on the number of rows and the output
+    is never left half written. Unique values before and after normalization
+    are counted in the same pass. Parquet and Feather files (by suffix, on
+    either side) are processed in chunks through columnar_io.
+    
     Args:
-        input_csv: Input CSV file path
-        output_csv: Output CSV file path (if None, overwrites input file)
+        input_csv: Input CSV, Parquet or Feather file path
+        output_csv: Output file path (if None, overwrites input file)
         backup: Whether to create backup of original file
+        approximate: Count unique values with HyperLogLog sketches instead of sets
     """
     input_path = Path(input_csv)
     
@@ -74,69 +141,34 @@ def normalize_csv_cities(input_csv: str, output_csv: Optional[str] = None, backu
         if backup:
             backup_path = input_path.parent / f"{input_path.stem}_backup{input_path.suffix}"
             print(f"Creating backup: {backup_path}")
-            import shutil
-            shutil.copy2(input_path, backup_path)
-            print(f"Backup created successfully")
+            method = _make_backup(input_path, backup_path)
+            print(f"Backup created successfully ({method})")
     else:
         output_path = Path(output_csv)
     
-    # Read CSV
-    print(f"Reading CSV file: {input_path}")
-    with open(input_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
-    
-    print(f"Found {len(rows)} rows")
-    
-    # Normalize geographic fields
-    geo_fields = ['location', 'city', 'region']
-    normalized_count = 0
-    
-    for row in rows:
-        for field in geo_fields:
-            if field in row and row[field]:
-                original = row[field]
-                normalized = normalize_city_name(original)
-                if original != normalized:
-                    row[field] = normalized
-                    normalized_count += 1
-    
-    # Write normalized CSV
-    print(f"Normalizing {normalized_count} geographic fields...")
+    print(f"Reading file: {input_path}")
     print(f"Writing to: {output_path}")
-    
-    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-    
+    # Keep the suffix so the temporary file is written in the output's format
+    tmp_path = output_path.with_name(f".{output_path.stem}.tmp{output_path.suffix}")
+    normalize = _normalize_frames if is_columnar(input_path) or is_columnar(output_path) else _normalize_rows
+    try:
+        row_count, normalized_count, fields, unique_before, unique_after = normalize(input_path, tmp_path, approximate)
+        os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    
+    print(f"Found {row_count} rows")
     print(f"Successfully normalized CSV file!")
     print(f"Total changes: {normalized_count}")
     
     # Show statistics
-    print(f"\nNormalization Statistics:")
-    for field in geo_fields:
-        if field in fieldnames:
-            unique_before = set()
-            unique_after = set()
-            
-            # Read original to compare (if backup exists)
-            if backup and backup_path.exists():
-                with open(backup_path, 'r', encoding='utf-8-sig') as bf:
-                    b_reader = csv.DictReader(bf)
-                    for r in b_reader:
-                        if r.get(field):
-                            unique_before.add(r[field])
-            
-            # Count unique after
-            for row in rows:
-                if row.get(field):
-                    unique_after.add(row[field])
-            
-            print(f"  {field}:")
-            print(f"    Unique values before: {len(unique_before)}" if unique_before else "    Unique values after: {len(unique_after)}")
-            print(f"    Unique values after: {len(unique_after)}")
+    approx = " (approximate)" if approximate else ""
+    print(f"\nNormalization Statistics{approx}:")
+    for field in fields:
+        print(f"  {field}:")
+        print(f"    Unique values before: {unique_before[field].count()}")
+        print(f"    Unique values after: {unique_after[field].count()}")
     
     return True
 
@@ -151,19 +183,24 @@ def main():
     parser.add_argument(
         'input_csv',
         type=str,
-        help='Input CSV file path'
+        help='Input file path (.csv, .parquet or .feather)'
     )
     parser.add_argument(
         '-o', '--output',
         type=str,
         default=None,
-        help='Output CSV file path (default: overwrites input file)'
+        help='Output file path; .parquet/.feather write a typed columnar file (default: overwrites input file)'
     )
     parser.add_argument(
         '--no-backup',
         action='store_true',
         help='Do not create backup of original file'
     )
+    parser.add_argument(
+        '--approximate',
+        action='store_true',
+        help='Count unique values with HyperLogLog sketches (bounded memory for huge files)'
+    )
     
     args = parser.parse_args()
     
@@ -175,7 +212,8 @@ def main():
     success = normalize_csv_cities(
         input_csv=args.input_csv,
         output_csv=args.output,
-        backup=not args.no_backup
+        backup=not args.no_backup,
+        approximate=args.approximate
     )
     
     if success:
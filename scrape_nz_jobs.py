@@ -5,58 +5,1064 @@ Scrapes IT job data from Seek and saves to CSV file for data visualization
 import asyncio
 import sys
 import csv
+import hashlib
+import json
 import re
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from html.parser import HTMLParser
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable, Iterator, Set, Tuple
 from urllib.parse import quote_plus
 
+from location_normalizer import clean_city_name
+
 try:
-    from playwright.async_api import async_playwright, Browser, Page
+    from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 except ImportError:
-    print("Error: playwright is not installed. Please install it with: pip install playwright")
-    print("Then run: playwright install")
-    sys.exit(1)
+    # Offline HTML parsing works without playwright; browser scraping calls
+    # _require_playwright() before launching anything.
+    async_playwright = None
+    Browser = BrowserContext = Page = Any
+
+
+def _require_playwright():
+    """Exit with install instructions when playwright is not available"""
+    if async_playwright is None:
+        print("Error: playwright is not installed. Please install it with: pip install playwright")
+        print("Then run: playwright install")
+        sys.exit(1)
+
+
+async def _launch_browser(playwright, browser_name: str = "firefox", headless: bool = False) -> Browser:
+    """
+    Launch a Playwright browser by engine name
+
+    Args:
+        playwright: Running Playwright instance
+        browser_name: Browser to use (chromium, firefox, webkit)
+        headless: Run browser in headless mode
+
+    Returns:
+        Launched browser
+    """
+    if browser_name == "chromium":
+        return await playwright.chromium.launch(headless=headless)
+    elif browser_name == "webkit":
+        return await playwright.webkit.launch(headless=headless)
+    return await playwright.firefox.launch(headless=headless)
+
+
+def _build_search_url(keywords: str, country: str = "nz", page_number: int = 1) -> Tuple[str, str]:
+    """
+    Build the Seek search URL for a keyword
+
+    Args:
+        keywords: Search keywords
+        country: Country code (nz for New Zealand)
+        page_number: 1-based results page
+
+    Returns:
+        Tuple of (site base URL, search URL)
+    """
+    base_url = "https://www.seek.co.nz" if country.lower() == "nz" else "https://www.seek.com.au"
+    search_query = quote_plus(keywords)
+    url = f"{base_url}/jobs?keywords={search_query}"
+    if page_number > 1:
+        url += f"&page={page_number}"
+    return base_url, url
+
+
+class PagePool:
+    """
+    Fixed-size pool of pages on one shared browser
+
+    Each page lives in its own browser context so concurrent keywords do not
+    share cookies or storage. Workers borrow a page with ``async with
+    pool.page() as page`` and it is returned to the pool afterwards. In lean
+    mode every context blocks non-essential resources (see _enable_lean_mode).
+    """
+
+    def __init__(self, browser: Browser, size: int, lean: bool = True, timings: Optional["PageTimings"] = None):
+        self.browser = browser
+        self.size = max(1, size)
+        self.lean = lean
+        self.timings = timings
+        self._contexts: List[BrowserContext] = []
+        self._pages: "asyncio.Queue[Page]" = asyncio.Queue()
+
+    async def start(self) -> "PagePool":
+        for _ in range(self.size):
+            context = await self.browser.new_context()
+            if self.lean:
+                await _enable_lean_mode(context, self.timings)
+            self._contexts.append(context)
+            self._pages.put_nowait(await context.new_page())
+        return self
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            self._pages.put_nowait(page)
+
+    async def close(self):
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts.clear()
+
+
+# Job card containers, tried in order until one matches
+JOB_CARD_SELECTORS = [
+    '[data-automation="normalJob"]',
+    'article[data-testid="job-card"]',
+    'div[data-search-sol-meta]',
+]
+
+# Card field -> selector fallback chain, evaluated inside each job card
+CARD_FIELD_SELECTORS: Dict[str, List[str]] = {
+    'title': [
+        'a[data-automation="jobTitle"]',
+        'h3 a',
+        '[data-testid="job-title"]',
+    ],
+    'company': [
+        'a[data-automation="jobCompany"]',
+        '[data-testid="company-name"]',
+        'span[data-automation="jobCompany"]',
+    ],
+    'location': [
+        'a[data-automation="jobLocation"]',
+        '[data-testid="job-location"]',
+        'span[data-automation="jobLocation"]',
+    ],
+    'salary': [
+        'span[data-automation="jobSalary"]',
+        '[data-testid="job-salary"]',
+    ],
+    'description': [
+        'span[data-automation="jobShortDescription"]',
+        '[data-testid="job-abstract"]',
+    ],
+    'posted_date': [
+        'span[data-automation="jobListingDate"]',
+        '[data-testid="job-date"]',
+    ],
+    'work_type': [
+        '[data-automation="jobWorkType"]',
+    ],
+}
+
+# The job link is the href of whichever element matched this field
+CARD_LINK_FIELD = 'title'
+
+# Lean page mode: resource types and third-party hosts the job cards never need
+BLOCKED_RESOURCE_TYPES = frozenset(['image', 'media', 'font', 'stylesheet'])
+BLOCKED_URL_PATTERN = re.compile(
+    r'google-analytics|googletagmanager|doubleclick|googlesyndication|facebook\.(?:net|com)/tr'
+    r'|hotjar|newrelic|nr-data\.net|segment\.(?:io|com)|optimizely|clarity\.ms|bat\.bing'
+    r'|tiktok|snapchat|linkedin\.com/px|adservice',
+    re.I
+)
+
+# Matches as soon as any job card container is in the DOM
+JOB_CARD_READY_SELECTOR = ', '.join(JOB_CARD_SELECTORS)
+READY_TIMEOUT_MS = 15000
 
 
-def _normalize_city_name(city_name: str) -> str:
+class PageTimings:
     """
-    Normalize city name by removing common suffixes like CBD, Central, etc.
+    Wall-clock timings of every results page loaded in a run
+    
+    Phases: navigate (goto until its wait_until event), ready (waiting for
+    job cards, or the fixed wait outside lean mode) and extract (reading the
+    cards). Also counts requests aborted by lean mode.
+    """
+    
+    PHASES = ('navigate', 'ready', 'extract')
+    
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {phase: [] for phase in self.PHASES}
+        self.blocked_requests = 0
+    
+    def add(self, phase: str, seconds: float):
+        self.samples[phase].append(seconds)
+    
+    @property
+    def pages(self) -> int:
+        return len(self.samples['navigate'])
+    
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for phase in self.PHASES:
+            values = sorted(self.samples[phase])
+            if not values:
+                continue
+            mean = sum(values) / len(values)
+            p50 = values[len(values) // 2]
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            lines.append(f"  {phase:<9} mean {mean * 1000:7.0f} ms  p50 {p50 * 1000:7.0f} ms  p95 {p95 * 1000:7.0f} ms")
+        per_page = [sum(phase) for phase in zip(*(self.samples[p] for p in self.PHASES))]
+        if per_page:
+            lines.append(f"  {'total':<9} mean {sum(per_page) / len(per_page) * 1000:7.0f} ms per page over {len(per_page)} pages")
+        if self.blocked_requests:
+            lines.append(f"  Blocked requests: {self.blocked_requests}")
+        return lines
+
+
+async def _enable_lean_mode(target, timings: Optional[PageTimings] = None):
+    """
+    Abort images, fonts, stylesheets, media and tracker requests
     
     Args:
-        city_name: Raw city name from scraped data
+        target: Browser context or page to install the route on
+        timings: Counts aborted requests when given
+    """
+    async def _route(route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_PATTERN.search(request.url):
+            if timings is not None:
+                timings.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
     
+    await target.route("**/*", _route)
+
+
+# Runs in the page: finds the cards and reads every field of every card in
+# one round trip. Returns {"total": <cards found>, "records": [raw card, ...]}.
+_EXTRACT_CARDS_JS = """
+([cardSelectors, fieldSelectors, linkField, maxResults]) => {
+    let cards = [];
+    for (const selector of cardSelectors) {
+        cards = Array.from(document.querySelectorAll(selector));
+        if (cards.length) break;
+    }
+    const limited = maxResults == null ? cards : cards.slice(0, maxResults);
+    const records = limited.map((card) => {
+        const record = {};
+        for (const [field, selectors] of Object.entries(fieldSelectors)) {
+            let elem = null;
+            for (const selector of selectors) {
+                elem = card.querySelector(selector);
+                if (elem) break;
+            }
+            record[field] = elem ? elem.innerText : null;
+            if (field === linkField) {
+                record.href = elem ? elem.getAttribute('href') : null;
+            }
+        }
+        return record;
+    });
+    return {total: cards.length, records: records};
+}
+"""
+
+
+def _build_job_record(raw: Dict[str, Optional[str]], base_url: str) -> Dict[str, Any]:
+    """
+    Turn raw card field text into a job record
+
+    Args:
+        raw: Field name -> element text (None when no selector matched), plus 'href'
+        base_url: Site base URL used to absolutize job links
+
     Returns:
-        Normalized city name
-    """
-    if not city_name:
-        return ""
-    
-    # Common suffixes to remove (case insensitive)
-    suffixes_to_remove = [
-        " cbd",
-        " CBD",
-        " central",
-        " Central",
-        " CENTRAL",
-        " north",
-        " North",
-        " south",
-        " South",
-        " east",
-        " East",
-        " west",
-        " West"
-    ]
+        Job dictionary with derived city/region, salary range and job ID
+    """
+    job_data = {}
+    
+    title = raw.get('title')
+    if title is not None:
+        job_data['title'] = title.strip()
+        # Extract URL
+        href = raw.get('href')
+        if href:
+            if href.startswith('/'):
+                job_data['url'] = f"{base_url}{href}"
+            else:
+                job_data['url'] = href
+    else:
+        job_data['title'] = ""
+        job_data['url'] = ""
+    
+    company = raw.get('company')
+    job_data['company'] = company.strip() if company is not None else ""
+    
+    location = raw.get('location')
+    if location is not None:
+        location_text = location.strip()
+        job_data['location'] = location_text
+        # Try to extract city/region from location
+        location_parts = location_text.split(',')
+        city_normalized = ""
+        if len(location_parts) > 0:
+            raw_city = location_parts[0].strip()
+            # Normalize city name: remove CBD, Central, etc.
+            city_normalized = clean_city_name(raw_city)
+            job_data['city'] = city_normalized
+        if len(location_parts) > 1:
+            job_data['region'] = location_parts[-1].strip()
+        else:
+            # If no comma, use normalized city as region
+            job_data['region'] = city_normalized if city_normalized else location_text
+    else:
+        job_data['location'] = ""
+        job_data['city'] = ""
+        job_data['region'] = ""
+    
+    salary = raw.get('salary')
+    if salary is not None:
+        salary_text = salary.strip()
+        job_data['salary'] = salary_text
+        # Try to extract salary range
+        salary_match = re.search(r'(\d+(?:,\d{3})*)\s*-\s*(\d+(?:,\d{3})*)', salary_text)
+        if salary_match:
+            job_data['salary_min'] = salary_match.group(1).replace(',', '')
+            job_data['salary_max'] = salary_match.group(2).replace(',', '')
+        else:
+            single_match = re.search(r'(\d+(?:,\d{3})*)', salary_text)
+            if single_match:
+                job_data['salary_min'] = single_match.group(1).replace(',', '')
+                job_data['salary_max'] = ""
+    else:
+        job_data['salary'] = ""
+        job_data['salary_min'] = ""
+        job_data['salary_max'] = ""
+    
+    description = raw.get('description')
+    job_data['description'] = description.strip() if description is not None else ""
+    
+    posted_date = raw.get('posted_date')
+    job_data['posted_date'] = posted_date.strip() if posted_date is not None else ""
+    
+    # Extract job ID from URL if possible
+    if job_data.get('url'):
+        job_id_match = re.search(r'/(\d+)$', job_data['url'])
+        if job_id_match:
+            job_data['job_id'] = job_id_match.group(1)
+        else:
+            job_id_match = re.search(r'/job/(\d+)', job_data['url'])
+            if job_id_match:
+                job_data['job_id'] = job_id_match.group(1)
+            else:
+                job_data['job_id'] = ""
+    else:
+        job_data['job_id'] = ""
+    
+    work_type = raw.get('work_type')
+    job_data['work_type'] = work_type.strip() if work_type is not None else ""
+    
+    job_data['job_type'] = ""
+    
+    return job_data
+
+
+def _records_to_jobs(raw_records: List[Dict[str, Optional[str]]], base_url: str) -> List[Dict[str, Any]]:
+    """
+    Build job records from raw card fields, keeping only cards with a title
+
+    Args:
+        raw_records: Raw card fields as returned by an extraction path
+        base_url: Site base URL used to absolutize job links
+
+    Returns:
+        List of job dictionaries
+    """
+    jobs = []
+    for i, raw in enumerate(raw_records):
+        try:
+            job_data = _build_job_record(raw, base_url)
+            if job_data.get('title'):  # Only add if we have at least a title
+                jobs.append(job_data)
+        except Exception as e:
+            print(f"    Warning: Failed to extract job {i+1}: {e}")
+    return jobs
+
+
+class _HtmlNode:
+    """Minimal element node built by _SeekHtmlTreeBuilder"""
+
+    __slots__ = ('tag', 'attrs', 'parent', 'children', 'text')
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["_HtmlNode"]):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children: List["_HtmlNode"] = []
+        # Text chunks and child nodes in document order
+        self.text: List[Any] = []
+
+    def iter_descendants(self) -> Iterator["_HtmlNode"]:
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def inner_text(self) -> str:
+        parts = []
+        stack = list(reversed(self.text))
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            else:
+                stack.extend(reversed(item.text))
+        # Collapse whitespace the way the browser renders inline text
+        return " ".join("".join(parts).split())
+
+
+class _SeekHtmlTreeBuilder(HTMLParser):
+    """Build an _HtmlNode tree from a page, skipping script/style content"""
+
+    VOID_TAGS = frozenset([
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+        'link', 'meta', 'param', 'source', 'track', 'wbr',
+    ])
+    SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'template'])
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _HtmlNode('#document', {}, None)
+        self._stack = [self.root]
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_depth:
+            if tag in self.SKIP_TAGS:
+                self._skip_depth += 1
+            return
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = 1
+            return
+        parent = self._stack[-1]
+        node = _HtmlNode(tag, {name: value or "" for name, value in attrs}, parent)
+        parent.children.append(node)
+        parent.text.append(node)
+        if tag not in self.VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        if self._skip_depth or tag in self.SKIP_TAGS:
+            return
+        parent = self._stack[-1]
+        node = _HtmlNode(tag, {name: value or "" for name, value in attrs}, parent)
+        parent.children.append(node)
+        parent.text.append(node)
+
+    def handle_endtag(self, tag):
+        if self._skip_depth:
+            if tag in self.SKIP_TAGS:
+                self._skip_depth -= 1
+            return
+        # Close up to the matching open tag; ignore stray end tags
+        for depth in range(len(self._stack) - 1, 0, -1):
+            if self._stack[depth].tag == tag:
+                del self._stack[depth:]
+                return
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._stack[-1].text.append(data)
+
+
+_SELECTOR_PART = re.compile(r'^([a-zA-Z0-9]*)((?:\[[^\]]+\])*)$')
+_SELECTOR_ATTR = re.compile(r'\[\s*([\w-]+)\s*(?:=\s*"([^"]*)")?\s*\]')
+
+
+@lru_cache(maxsize=None)
+def _compile_selector(selector: str) -> Tuple[Tuple[str, Tuple[Tuple[str, Optional[str]], ...]], ...]:
+    """
+    Compile the CSS subset used in the selector tables
+
+    Supports descendant combinators of compound selectors made of an optional
+    tag name plus [attr] / [attr="value"] conditions, e.g. 'h3 a' or
+    'span[data-automation="jobSalary"]'.
+
+    Returns:
+        Tuple of (tag, ((attr, value or None), ...)) from outermost to innermost
+    """
+    compiled = []
+    for part in selector.split():
+        match = _SELECTOR_PART.match(part)
+        if not match:
+            raise ValueError(f"Unsupported selector: {selector}")
+        tag, attr_text = match.groups()
+        # [attr] only tests presence, so its value stays None
+        attrs = tuple(m.groups() for m in _SELECTOR_ATTR.finditer(attr_text))
+        compiled.append((tag.lower(), attrs))
+    return tuple(compiled)
+
+
+def _node_matches(node: _HtmlNode, compound: Tuple[str, Tuple[Tuple[str, Optional[str]], ...]]) -> bool:
+    tag, attrs = compound
+    if tag and node.tag != tag:
+        return False
+    for name, value in attrs:
+        actual = node.attrs.get(name)
+        if actual is None or (value is not None and actual != value):
+            return False
+    return True
+
+
+def _selector_matches(node: _HtmlNode, compiled) -> bool:
+    if not _node_matches(node, compiled[-1]):
+        return False
+    # Walk ancestors for the remaining compounds (descendant combinator)
+    ancestor = node.parent
+    for compound in reversed(compiled[:-1]):
+        while ancestor is not None and not _node_matches(ancestor, compound):
+            ancestor = ancestor.parent
+        if ancestor is None:
+            return False
+        ancestor = ancestor.parent
+    return True
+
+
+def _query_all(scope: _HtmlNode, selector: str) -> List[_HtmlNode]:
+    compiled = _compile_selector(selector)
+    return [node for node in scope.iter_descendants() if _selector_matches(node, compiled)]
+
+
+def _query_first(scope: _HtmlNode, selector: str) -> Optional[_HtmlNode]:
+    compiled = _compile_selector(selector)
+    for node in scope.iter_descendants():
+        if _selector_matches(node, compiled):
+            return node
+    return None
+
+
+def parse_cards_html(html: str, max_results: Optional[int] = None) -> Tuple[int, List[Dict[str, Optional[str]]]]:
+    """
+    Read job card fields from search results HTML without a browser
+
+    Uses the same JOB_CARD_SELECTORS / CARD_FIELD_SELECTORS tables as the
+    browser extraction paths, so records feed straight into _records_to_jobs.
+
+    Args:
+        html: Search results page HTML
+        max_results: Maximum number of cards to read (None for all)
+
+    Returns:
+        Tuple of (number of cards found, raw card records)
+    """
+    builder = _SeekHtmlTreeBuilder()
+    builder.feed(html)
+    builder.close()
+    
+    cards: List[_HtmlNode] = []
+    for selector in JOB_CARD_SELECTORS:
+        cards = _query_all(builder.root, selector)
+        if cards:
+            break
+    
+    records = []
+    for card in cards[:max_results]:
+        record: Dict[str, Optional[str]] = {}
+        for field, selectors in CARD_FIELD_SELECTORS.items():
+            elem = None
+            for selector in selectors:
+                elem = _query_first(card, selector)
+                if elem:
+                    break
+            record[field] = elem.inner_text() if elem else None
+            if field == CARD_LINK_FIELD:
+                record['href'] = elem.attrs.get('href') if elem else None
+        records.append(record)
+    
+    return len(cards), records
+
+
+def parse_search_html(html: str, base_url: str = "https://www.seek.co.nz", max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Parse a saved Seek search results page into job records
+
+    Args:
+        html: Search results page HTML
+        base_url: Site base URL used to absolutize job links
+        max_results: Maximum number of results to return (None for all)
+
+    Returns:
+        List of job dictionaries with job information
+    """
+    _, records = parse_cards_html(html, max_results)
+    return _records_to_jobs(records, base_url)
+
+
+async def _extract_cards_bulk(page: Page, max_results: Optional[int]) -> Tuple[int, List[Dict[str, Optional[str]]]]:
+    """
+    Read every job card's fields with a single page.evaluate call
+
+    Args:
+        page: Page with search results loaded
+        max_results: Maximum number of cards to read (None for all)
+
+    Returns:
+        Tuple of (number of cards found, raw card records)
+    """
+    result = await page.evaluate(
+        _EXTRACT_CARDS_JS,
+        [JOB_CARD_SELECTORS, CARD_FIELD_SELECTORS, CARD_LINK_FIELD, max_results]
+    )
+    return result['total'], result['records']
+
+
+async def _extract_cards_per_element(page: Page, max_results: Optional[int]) -> Tuple[int, List[Dict[str, Optional[str]]]]:
+    """
+    Read job card fields with one query_selector/inner_text round trip per field
+
+    This is the original extraction path. It is much slower than
+    _extract_cards_bulk and is kept for comparison and as a fallback.
+
+    Args:
+        page: Page with search results loaded
+        max_results: Maximum number of cards to read (None for all)
+
+    Returns:
+        Tuple of (number of cards found, raw card records)
+    """
+    job_cards = []
+    for selector in JOB_CARD_SELECTORS:
+        job_cards = await page.query_selector_all(selector)
+        if job_cards:
+            break
+    
+    records = []
+    for i, card in enumerate(job_cards[:max_results]):
+        try:
+            record: Dict[str, Optional[str]] = {}
+            for field, selectors in CARD_FIELD_SELECTORS.items():
+                elem = None
+                for selector in selectors:
+                    elem = await card.query_selector(selector)
+                    if elem:
+                        break
+                record[field] = (await elem.inner_text()) if elem else None
+                if field == CARD_LINK_FIELD:
+                    record['href'] = (await elem.get_attribute('href')) if elem else None
+            records.append(record)
+        except Exception as e:
+            print(f"    Warning: Failed to extract job {i+1}: {e}")
+            continue
+    
+    return len(job_cards), records
+
+
+async def _extract_cards_html(page: Page, max_results: Optional[int]) -> Tuple[int, List[Dict[str, Optional[str]]]]:
+    """
+    Fetch the rendered page HTML once and parse the cards in Python
+
+    Parsing runs in a worker thread so the event loop keeps driving the
+    other pages while this one is parsed.
+
+    Args:
+        page: Page with search results loaded
+        max_results: Maximum number of cards to read (None for all)
+
+    Returns:
+        Tuple of (number of cards found, raw card records)
+    """
+    html = await page.content()
+    return await asyncio.to_thread(parse_cards_html, html, max_results)
+
+
+EXTRACTION_METHODS = {
+    'bulk': _extract_cards_bulk,
+    'per-element': _extract_cards_per_element,
+    'html': _extract_cards_html,
+}
+
+
+def _snapshot_name(keywords: str, page_number: int = 1) -> str:
+    """File name for a saved search results page, e.g. python_developer_p1.html"""
+    slug = re.sub(r'[^a-z0-9]+', '_', keywords.lower()).strip('_')
+    return f"{slug}_p{page_number}.html"
+
+
+def _keyword_from_snapshot(path: Path) -> str:
+    """Recover the search keyword from a _snapshot_name file name"""
+    stem = re.sub(r'_p\d+$', '', path.stem)
+    return stem.replace('_', ' ')
+
+
+def _parse_snapshot_file(path: str, max_results: Optional[int] = None, country: str = "nz") -> List[Dict[str, Any]]:
+    """
+    Parse one saved search results page into job records
+
+    Top-level so it can run in a process pool.
+
+    Args:
+        path: Saved HTML file path
+        max_results: Maximum number of results to return (None for all)
+        country: Country code the page was fetched for
+
+    Returns:
+        List of job dictionaries tagged with search_keyword
+    """
+    snapshot = Path(path)
+    base_url, _ = _build_search_url("", country)
+    html = snapshot.read_text(encoding='utf-8', errors='replace')
+    jobs = parse_search_html(html, base_url, max_results)
+    keyword = _keyword_from_snapshot(snapshot)
+    for job in jobs:
+        job['search_keyword'] = keyword
+    return jobs
+
+
+def _collect_snapshot_paths(inputs: List[str]) -> List[Path]:
+    paths: List[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths.extend(sorted(path.glob('*.html')))
+        elif path.exists():
+            paths.append(path)
+        else:
+            paths.extend(sorted(Path().glob(item)))
+    return paths
+
+
+def parse_saved_pages(
+    inputs: List[str],
+    output_csv: str = None,
+    max_per_page: Optional[int] = None,
+    workers: Optional[int] = None
+) -> int:
+    """
+    Parse saved Seek search result pages into a CSV file without a browser
+
+    Pages are parsed in a process pool, one file per task.
+
+    Args:
+        inputs: HTML files, directories of .html files, or glob patterns
+        output_csv: Output CSV file path (default: nz_jobs_YYYYMMDD_HHMMSS.csv)
+        max_per_page: Maximum number of jobs to keep per page (None for all)
+        workers: Number of parser processes (default: CPU count)
+
+    Returns:
+        Number of jobs written
+    """
+    paths = _collect_snapshot_paths(inputs)
+    print("="*60)
+    print("Parsing saved Seek search result pages")
+    print(f"Pages found: {len(paths)}")
+    print("="*60)
+    
+    if not paths:
+        print("⚠ Warning: No HTML pages to parse")
+        return 0
+    
+    if output_csv is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_csv = f"nz_jobs_{timestamp}.csv"
+    output_path = Path(__file__).parent / output_csv
+    
+    started = time.perf_counter()
+    dedup = JobDeduplicator()
+    with JobCsvWriter(output_path) as writer:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(paths) // ((workers or 4) * 4))
+            for jobs in executor.map(
+                _parse_snapshot_file,
+                [str(path) for path in paths],
+                [max_per_page] * len(paths),
+                chunksize=chunksize
+            ):
+                for job in jobs:
+                    if dedup.add(job, job['search_keyword']):
+                        job['search_keywords'] = job['search_keyword']
+                        writer.write(job)
+        total_jobs = writer.rows_written
+    dedup.rewrite_keywords(output_path)
+    elapsed = time.perf_counter() - started
+    
+    print(f"\n{'='*60}")
+    print(f"Parsed {len(paths)} pages in {elapsed:.2f}s ({len(paths) / elapsed:.1f} pages/s)")
+    print(f"Total jobs parsed: {total_jobs}")
+    if total_jobs:
+        print(f"File path: {output_path}")
+    print(f"{'='*60}")
+    return total_jobs
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every page worker, with adaptive rate
+    
+    Requests are admitted at up to ``rate`` per second with bursts of
+    ``burst``. After each request, record() feeds back what happened:
+    HTTP 429/503 responses, slow responses and pages without job cards cut
+    the rate by ``backoff`` (429/503 also pause all workers, honouring
+    Retry-After), as do failed loads (timeouts, navigation errors), while healthy responses raise it step by step back to the
+    configured ceiling (additive increase, multiplicative decrease).
+    """
+    
+    THROTTLE_STATUSES = frozenset([429, 503])
+    
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 3,
+        backoff: float = 0.5,
+        min_rate: Optional[float] = None,
+        slow_seconds: float = 10.0,
+        cooldown_seconds: float = 30.0
+    ):
+        self.max_rate = max(0.01, rate)
+        self.rate = self.max_rate
+        self.min_rate = min_rate if min_rate is not None else self.max_rate / 20
+        self.burst = max(1, burst)
+        self.backoff = min(max(backoff, 0.05), 0.95)
+        self.slow_seconds = slow_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.throttled = 0
+        self.requests = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.requests += 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    def _slow_down(self, factor: float):
+        self._refill(time.monotonic())
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.throttled += 1
+    
+    def record(
+        self,
+        latency: float,
+        status: Optional[int] = None,
+        cards: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        failed: bool = False
+    ):
+        """
+        Adjust the rate from the outcome of one request
+        
+        Args:
+            latency: Seconds the request took
+            status: HTTP status of the main document, if known
+            cards: Job cards found on the page, if it was parsed
+            retry_after: Seconds from a Retry-After header, if any
+            failed: The request raised (timeout, navigation or page error)
+        """
+        if status in self.THROTTLE_STATUSES:
+            self._slow_down(self.backoff)
+            pause = retry_after if retry_after is not None else self.cooldown_seconds
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        elif failed or latency > self.slow_seconds:
+            self._slow_down(self.backoff)
+        elif cards == 0:
+            # An empty page is often a soft block; back off gently
+            self._slow_down(self.backoff ** 0.5)
+        else:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+    
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests, current rate {self.rate:.2f}/s "
+            f"(ceiling {self.max_rate:.2f}/s), {self.throttled} slow-downs"
+        )
+
+
+def _retry_after_seconds(response) -> Optional[float]:
+    try:
+        value = response.headers.get('retry-after')
+        return float(value) if value else None
+    except Exception:
+        return None
+
+
+async def _load_results_page(page: Page, url: str, lean: bool = True, timings: Optional[PageTimings] = None):
+    """
+    Navigate to a search results page and wait until it is ready to extract
+    
+    In lean mode only the DOM is awaited, then the first job card selector;
+    otherwise the original networkidle load plus a fixed 2 second wait.
+    
+    Args:
+        page: Page to navigate
+        url: Search results URL
+        lean: Use targeted readiness instead of networkidle + fixed wait
+        timings: Records navigate/ready durations when given
+    
+    Returns:
+        Main document response (None if there was none)
+    """
+    started = time.perf_counter()
+    if lean:
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        navigated = time.perf_counter()
+        try:
+            await page.wait_for_selector(JOB_CARD_READY_SELECTOR, state="attached", timeout=READY_TIMEOUT_MS)
+        except Exception:
+            # No cards showed up (no results or a blocked page); extraction reports 0
+            pass
+    else:
+        response = await page.goto(url, wait_until="networkidle", timeout=30000)
+        navigated = time.perf_counter()
+        await page.wait_for_timeout(2000)  # Wait for page to load
+    
+    if timings is not None:
+        timings.add('navigate', navigated - started)
+        timings.add('ready', time.perf_counter() - navigated)
+    return response
+
+
+# Times each results page is retried after a timeout or page error (the
+# budget is reset once a page loads)
+PAGE_ERROR_RETRIES = 3
+
+
+async def iter_seek_jobs(
+    page: Page,
+    keywords: str,
+    max_results: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    country: str = "nz",
+    extraction: str = "bulk",
+    save_html_dir: Optional[Path] = None,
+    rate_limiter: Optional[AdaptiveRateLimiter] = None,
+    start_page: int = 1,
+    on_page_done: Optional[Callable[[int], None]] = None,
+    lean: bool = True,
+    timings: Optional[PageTimings] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream job listings for a keyword, following Seek pagination
+    
+    Each job is yielded as soon as its card has been parsed. Stops when the
+    result or page budget is used up, or when a page has no new cards.
     
-    normalized = city_name.strip()
+    Args:
+        page: Page to load the results on
+        keywords: Search keywords
+        max_results: Maximum number of jobs to yield (None for no limit)
+        max_pages: Maximum number of results pages to load (None for no limit)
+        country: Country code (nz for New Zealand)
+        extraction: Card extraction path (bulk, per-element, html)
+        save_html_dir: Directory to save each fetched results page to, for offline re-parsing
+        rate_limiter: Shared limiter to acquire before, and report to after, every page load
+        start_page: 1-based results page to start from (for resuming)
+        on_page_done: Called with the page number once every job of that page has been consumed
+        lean: Wait for job cards instead of networkidle + fixed wait (see _load_results_page)
+        timings: Collects per-page navigate/ready/extract timings
     
-    # Remove suffixes
-    for suffix in suffixes_to_remove:
-        if normalized.endswith(suffix):
-            normalized = normalized[:-len(suffix)].strip()
+    Yields:
+        Job dictionaries with job information
+    """
+    yielded = 0
+    page_number = start_page
+    previous_ids: Optional[set] = None
+    throttle_retries = 3
+    error_retries = PAGE_ERROR_RETRIES
     
-    return normalized
+    while max_pages is None or page_number <= max_pages:
+        if max_results is not None and yielded >= max_results:
+            return
+        
+        load_started = time.perf_counter()
+        try:
+            base_url, url = _build_search_url(keywords, country, page_number)
+            if rate_limiter is not None:
+                await rate_limiter.acquire()
+            print(f"  Navigating to: {url}")
+            load_started = time.perf_counter()
+            response = await _load_results_page(page, url, lean, timings)
+            load_seconds = time.perf_counter() - load_started
+            status = response.status if response is not None else None
+            
+            if status in AdaptiveRateLimiter.THROTTLE_STATUSES and throttle_retries > 0:
+                # Throttled: slow everyone down and retry this page
+                throttle_retries -= 1
+                print(f"  ⚠ HTTP {status} on page {page_number}, backing off")
+                if rate_limiter is not None:
+                    rate_limiter.record(load_seconds, status, retry_after=_retry_after_seconds(response))
+                continue
+            
+            if save_html_dir is not None:
+                save_html_dir.mkdir(parents=True, exist_ok=True)
+                snapshot = save_html_dir / _snapshot_name(keywords, page_number)
+                snapshot.write_text(await page.content(), encoding='utf-8')
+            
+            remaining = max_results - yielded if max_results is not None else None
+            extract_started = time.perf_counter()
+            total, raw_records = await EXTRACTION_METHODS[extraction](page, remaining)
+            if timings is not None:
+                timings.add('extract', time.perf_counter() - extract_started)
+        except Exception as e:
+            # Timeouts and page errors are the clearest sign of a struggling
+            # server: slow everyone down, then retry this page
+            if rate_limiter is not None:
+                rate_limiter.record(time.perf_counter() - load_started, failed=True)
+            if error_retries > 0:
+                error_retries -= 1
+                print(f"  ⚠ Error on page {page_number} ({e}), retrying ({error_retries} retries left)")
+                continue
+            print(f"  ✗ Giving up on '{keywords}' at page {page_number} after {PAGE_ERROR_RETRIES} retries: {e}")
+            import traceback
+            traceback.print_exc()
+            return
+        
+        # One flaky page must not use up the retries of the pages after it
+        error_retries = PAGE_ERROR_RETRIES
+        if rate_limiter is not None:
+            rate_limiter.record(load_seconds, status, total)
+        
+        print(f"  Found {total} job cards on page {page_number}")
+        if total == 0:
+            return
+        
+        # Past the last page Seek can serve the same cards again
+        page_ids = {raw.get('href') for raw in raw_records}
+        if page_ids == previous_ids:
+            return
+        previous_ids = page_ids
+        
+        for i, raw in enumerate(raw_records):
+            try:
+                job_data = _build_job_record(raw, base_url)
+            except Exception as e:
+                print(f"    Warning: Failed to extract job {i+1}: {e}")
+                continue
+            if job_data.get('title'):  # Only add if we have at least a title
+                yielded += 1
+                yield job_data
+        
+        if on_page_done is not None:
+            on_page_done(page_number)
+        page_number += 1
 
 
 async def scrape_seek_search(
@@ -64,203 +1070,72 @@ async def scrape_seek_search(
     max_results: int = 10,
     headless: bool = False,
     browser_name: str = "firefox",
-    country: str = "nz"
+    country: str = "nz",
+    page: Optional[Page] = None,
+    extraction: str = "bulk",
+    save_html_dir: Optional[Path] = None,
+    max_pages: Optional[int] = 1,
+    lean: bool = True
 ) -> List[Dict[str, Any]]:
     """
     Scrape job listings from Seek website
     
+    Collects iter_seek_jobs into a list.
+    
     Args:
         keywords: Search keywords
         max_results: Maximum number of results to return
         headless: Run browser in headless mode
         browser_name: Browser to use (chromium, firefox, webkit)
         country: Country code (nz for New Zealand)
+        page: Existing page to reuse; when None a browser is launched and closed for this call
+        extraction: Card extraction path (bulk: one DOM call per page, per-element: one call per field, html: parse page HTML in Python)
+        save_html_dir: Directory to save the fetched results pages to, for offline re-parsing
+        max_pages: Maximum number of results pages to load (default: 1, None for no limit)
+        lean: Block non-essential resources and wait only for job cards
     
     Returns:
         List of job dictionaries with job information
     """
-    jobs = []
-    
-    try:
-        async with async_playwright() as p:
-            # Launch browser
-            if browser_name == "chromium":
-                browser = await p.chromium.launch(headless=headless)
-            elif browser_name == "webkit":
-                browser = await p.webkit.launch(headless=headless)
-            else:
-                browser = await p.firefox.launch(headless=headless)
-            
-            page = await browser.new_page()
-            
-            # Build Seek URL for New Zealand
-            base_url = "https://www.seek.co.nz" if country.lower() == "nz" else "https://www.seek.com.au"
-            search_query = quote_plus(keywords)
-            url = f"{base_url}/jobs?keywords={search_query}"
-            
-            print(f"  Navigating to: {url}")
-            await page.goto(url, wait_until="networkidle", timeout=30000)
-            await page.wait_for_timeout(2000)  # Wait for page to load
-            
-            # Extract job listings
-            job_cards = await page.query_selector_all('[data-automation="normalJob"]')
-            
-            if not job_cards:
-                # Try alternative selectors
-                job_cards = await page.query_selector_all('article[data-testid="job-card"]')
-            
-            if not job_cards:
-                # Try another common selector
-                job_cards = await page.query_selector_all('div[data-search-sol-meta]')
-            
-            print(f"  Found {len(job_cards)} job cards")
-            
-            # Extract data from each job card
-            for i, card in enumerate(job_cards[:max_results]):
+    if page is None:
+        _require_playwright()
+        try:
+            async with async_playwright() as p:
+                browser = await _launch_browser(p, browser_name, headless)
                 try:
-                    job_data = {}
-                    
-                    # Extract title
-                    title_elem = await card.query_selector('a[data-automation="jobTitle"]')
-                    if not title_elem:
-                        title_elem = await card.query_selector('h3 a')
-                    if not title_elem:
-                        title_elem = await card.query_selector('[data-testid="job-title"]')
-                    
-                    if title_elem:
-                        job_data['title'] = (await title_elem.inner_text()).strip()
-                        # Extract URL
-                        href = await title_elem.get_attribute('href')
-                        if href:
-                            if href.startswith('/'):
-                                job_data['url'] = f"{base_url}{href}"
-                            else:
-                                job_data['url'] = href
-                    else:
-                        job_data['title'] = ""
-                        job_data['url'] = ""
-                    
-                    # Extract company name
-                    company_elem = await card.query_selector('a[data-automation="jobCompany"]')
-                    if not company_elem:
-                        company_elem = await card.query_selector('[data-testid="company-name"]')
-                    if not company_elem:
-                        company_elem = await card.query_selector('span[data-automation="jobCompany"]')
-                    
-                    if company_elem:
-                        job_data['company'] = (await company_elem.inner_text()).strip()
-                    else:
-                        job_data['company'] = ""
-                    
-                    # Extract location
-                    location_elem = await card.query_selector('a[data-automation="jobLocation"]')
-                    if not location_elem:
-                        location_elem = await card.query_selector('[data-testid="job-location"]')
-                    if not location_elem:
-                        location_elem = await card.query_selector('span[data-automation="jobLocation"]')
-                    
-                    if location_elem:
-                        location_text = (await location_elem.inner_text()).strip()
-                        job_data['location'] = location_text
-                        # Try to extract city/region from location
-                        location_parts = location_text.split(',')
-                        city_normalized = ""
-                        if len(location_parts) > 0:
-                            raw_city = location_parts[0].strip()
-                            # Normalize city name: remove CBD, Central, etc.
-                            city_normalized = _normalize_city_name(raw_city)
-                            job_data['city'] = city_normalized
-                        if len(location_parts) > 1:
-                            job_data['region'] = location_parts[-1].strip()
-                        else:
-                            # If no comma, use normalized city as region
-                            job_data['region'] = city_normalized if city_normalized else location_text
-                    else:
-                        job_data['location'] = ""
-                        job_data['city'] = ""
-                        job_data['region'] = ""
-                    
-                    # Extract salary
-                    salary_elem = await card.query_selector('span[data-automation="jobSalary"]')
-                    if not salary_elem:
-                        salary_elem = await card.query_selector('[data-testid="job-salary"]')
-                    
-                    if salary_elem:
-                        salary_text = (await salary_elem.inner_text()).strip()
-                        job_data['salary'] = salary_text
-                        # Try to extract salary range
-                        salary_match = re.search(r'(\d+(?:,\d{3})*)\s*-\s*(\d+(?:,\d{3})*)', salary_text)
-                        if salary_match:
-                            job_data['salary_min'] = salary_match.group(1).replace(',', '')
-                            job_data['salary_max'] = salary_match.group(2).replace(',', '')
-                        else:
-                            single_match = re.search(r'(\d+(?:,\d{3})*)', salary_text)
-                            if single_match:
-                                job_data['salary_min'] = single_match.group(1).replace(',', '')
-                                job_data['salary_max'] = ""
-                    else:
-                        job_data['salary'] = ""
-                        job_data['salary_min'] = ""
-                        job_data['salary_max'] = ""
-                    
-                    # Extract job description snippet
-                    desc_elem = await card.query_selector('span[data-automation="jobShortDescription"]')
-                    if not desc_elem:
-                        desc_elem = await card.query_selector('[data-testid="job-abstract"]')
-                    
-                    if desc_elem:
-                        job_data['description'] = (await desc_elem.inner_text()).strip()
-                    else:
-                        job_data['description'] = ""
-                    
-                    # Extract posted date
-                    date_elem = await card.query_selector('span[data-automation="jobListingDate"]')
-                    if not date_elem:
-                        date_elem = await card.query_selector('[data-testid="job-date"]')
-                    
-                    if date_elem:
-                        job_data['posted_date'] = (await date_elem.inner_text()).strip()
-                    else:
-                        job_data['posted_date'] = ""
-                    
-                    # Extract job ID from URL if possible
-                    if job_data.get('url'):
-                        job_id_match = re.search(r'/(\d+)$', job_data['url'])
-                        if job_id_match:
-                            job_data['job_id'] = job_id_match.group(1)
-                        else:
-                            job_id_match = re.search(r'/job/(\d+)', job_data['url'])
-                            if job_id_match:
-                                job_data['job_id'] = job_id_match.group(1)
-                            else:
-                                job_data['job_id'] = ""
-                    else:
-                        job_data['job_id'] = ""
-                    
-                    # Extract work type
-                    work_type_elem = await card.query_selector('[data-automation="jobWorkType"]')
-                    if work_type_elem:
-                        job_data['work_type'] = (await work_type_elem.inner_text()).strip()
-                    else:
-                        job_data['work_type'] = ""
-                    
-                    job_data['job_type'] = ""
-                    
-                    if job_data.get('title'):  # Only add if we have at least a title
-                        jobs.append(job_data)
-                    
-                except Exception as e:
-                    print(f"    Warning: Failed to extract job {i+1}: {e}")
-                    continue
-            
-            await browser.close()
-            
-    except Exception as e:
-        print(f"  Error scraping jobs: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    return jobs
+                    own_page = await browser.new_page()
+                    if lean:
+                        await _enable_lean_mode(own_page)
+                    return await scrape_seek_search(
+                        keywords,
+                        max_results=max_results,
+                        country=country,
+                        page=own_page,
+                        extraction=extraction,
+                        save_html_dir=save_html_dir,
+                        max_pages=max_pages,
+                        lean=lean
+                    )
+                finally:
+                    await browser.close()
+        except Exception as e:
+            print(f"  Error scraping jobs: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+
+    return [
+        job async for job in iter_seek_jobs(
+            page,
+            keywords,
+            max_results=max_results,
+            max_pages=max_pages,
+            country=country,
+            extraction=extraction,
+            save_html_dir=save_html_dir,
+            lean=lean
+        )
+    ]
 
 
 NZ_IT_KEYWORDS = [
@@ -286,105 +1161,1101 @@ NZ_IT_KEYWORDS = [
     "node.js developer"
 ]
 
-async def scrape_nz_jobs(max_per_keyword: int = 10, headless: bool = False, browser: str = "firefox", output_csv: str = None):
+DEFAULT_CHECKPOINT = "scrape_checkpoint.json"
+DEFAULT_JOB_INDEX = "scrape_job_ids.txt"
+
+
+class ScrapeCheckpoint:
+    """
+    Progress of a scrape run, saved after every results page
+    
+    Records the output file and, per keyword, how many results pages and
+    jobs are done and whether the keyword is finished, so an interrupted run
+    can continue where it stopped.
+    """
+    
+    def __init__(self, path: Path, output: str):
+        self.path = Path(path)
+        self.output = output
+        self.keywords: Dict[str, Dict[str, Any]] = {}
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional["ScrapeCheckpoint"]:
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        checkpoint = cls(path, data.get('output', ''))
+        checkpoint.keywords = data.get('keywords', {})
+        return checkpoint
+    
+    def keyword_state(self, keyword: str) -> Dict[str, Any]:
+        return self.keywords.setdefault(keyword, {'pages_done': 0, 'jobs': 0, 'completed': False})
+    
+    def mark_page(self, keyword: str, page_number: int, jobs: int):
+        state = self.keyword_state(keyword)
+        state['pages_done'] = page_number
+        state['jobs'] += jobs
+        self.save()
+    
+    def mark_completed(self, keyword: str):
+        self.keyword_state(keyword)['completed'] = True
+        self.save()
+    
+    def save(self):
+        # Write to a temp file and rename so a crash never leaves half a checkpoint
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'output': self.output,
+                'updated': datetime.now().isoformat(timespec='seconds'),
+                'keywords': self.keywords,
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class JobIdIndex:
+    """
+    Persistent set of job IDs that have already been written
+    
+    Stored as an append-only text file with one job ID per line, so adding
+    an ID costs one short write however large the index grows. Membership
+    tests only cover IDs stored by earlier runs, so a job that shows up
+    under several keywords in the same run is not mistaken for a known one.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._ids: Set[str] = set()
+        self._new_ids: Set[str] = set()
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._ids.update(line.strip() for line in f if line.strip())
+        self._handle = None
+    
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._ids
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def add(self, job_id: str):
+        if not job_id or job_id in self._ids or job_id in self._new_ids:
+            return
+        self._new_ids.add(job_id)
+        if self._handle is None:
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        self._handle.write(job_id + '\n')
+    
+    def flush(self):
+        if self._handle is not None:
+            self._handle.flush()
+    
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+# Separator between keywords in the multi-valued search_keywords column
+KEYWORD_SEPARATOR = '|'
+
+
+def _dedup_key(job: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Identity of a posting across keywords
+    
+    Uses job_id when present, otherwise the URL without its query string,
+    otherwise title + company. Hashed to 8 bytes to keep the index small.
+    """
+    job_id = (job.get('job_id') or '').strip()
+    if job_id:
+        identity = 'id:' + job_id
+    else:
+        url = (job.get('url') or '').split('?')[0].strip()
+        if url:
+            identity = 'url:' + url
+        else:
+            title = ' '.join((job.get('title') or '').lower().split())
+            company = ' '.join((job.get('company') or '').lower().split())
+            if not title:
+                return None
+            identity = f'tc:{title}\x1f{company}'
+    return hashlib.blake2b(identity.encode('utf-8'), digest_size=8).digest()
+
+
+class JobDeduplicator:
+    """
+    Bounded in-memory index that merges the same posting seen under several keywords
+    
+    Maps each posting's _dedup_key to a bitmask of the keywords it was found
+    under, in an LRU of at most ``max_entries`` postings. The first sighting
+    is written as a row; later sightings only set a keyword bit. Merges are
+    also appended to a sidecar file so they survive a crash, and
+    rewrite_keywords() folds them into the search_keywords column at the end
+    of the run. A merge for a posting that was already evicted from the LRU
+    is written as a new row instead.
+    """
+    
+    def __init__(self, max_entries: int = 500_000, merge_log: Optional[Path] = None):
+        self.max_entries = max(1, max_entries)
+        self.merge_log = Path(merge_log) if merge_log else None
+        self._masks: "OrderedDict[bytes, int]" = OrderedDict()
+        self._keyword_bits: Dict[str, int] = {}
+        self._keywords: List[str] = []
+        self._log_handle = None
+        self.merged = 0
+    
+    def _bit(self, keyword: str) -> int:
+        bit = self._keyword_bits.get(keyword)
+        if bit is None:
+            bit = 1 << len(self._keywords)
+            self._keyword_bits[keyword] = bit
+            self._keywords.append(keyword)
+        return bit
+    
+    def _remember(self, key: bytes, mask: int):
+        self._masks[key] = mask
+        self._masks.move_to_end(key)
+        if len(self._masks) > self.max_entries:
+            self._masks.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._masks)
+    
+    def keywords_for(self, mask: int) -> List[str]:
+        return [keyword for i, keyword in enumerate(self._keywords) if mask >> i & 1]
+    
+    def add(self, job: Dict[str, Any], keyword: str) -> bool:
+        """
+        Record a sighting of a job under a keyword
+        
+        Returns:
+            True if the posting is new and should be written, False if it was merged
+        """
+        key = _dedup_key(job)
+        if key is None:
+            return True
+        
+        bit = self._bit(keyword)
+        mask = self._masks.get(key)
+        if mask is None:
+            self._remember(key, bit)
+            return True
+        
+        if not mask & bit:
+            self._remember(key, mask | bit)
+            self.merged += 1
+            if self.merge_log is not None:
+                if self._log_handle is None:
+                    self._log_handle = open(self.merge_log, 'a', encoding='utf-8')
+                self._log_handle.write(f"{key.hex()}\t{keyword}\n")
+        else:
+            self._masks.move_to_end(key)
+        return False
+    
+    def load_csv(self, csv_path: Path):
+        """Rebuild the index from a partially written output CSV and its merge log"""
+        if csv_path.exists():
+            with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+                for row in csv.DictReader(f):
+                    key = _dedup_key(row)
+                    if key is None:
+                        continue
+                    keywords = (row.get('search_keywords') or row.get('search_keyword') or '').split(KEYWORD_SEPARATOR)
+                    mask = self._masks.get(key, 0)
+                    for keyword in keywords:
+                        if keyword:
+                            mask |= self._bit(keyword)
+                    self._remember(key, mask)
+        if self.merge_log is not None and self.merge_log.exists():
+            with open(self.merge_log, 'r', encoding='utf-8') as f:
+                for line in f:
+                    key_hex, _, keyword = line.rstrip('\n').partition('\t')
+                    key = bytes.fromhex(key_hex)
+                    if key in self._masks:
+                        self._remember(key, self._masks[key] | self._bit(keyword))
+                        self.merged += 1
+    
+    def flush(self):
+        if self._log_handle is not None:
+            self._log_handle.flush()
+    
+    def rewrite_keywords(self, csv_path: Path) -> int:
+        """
+        Fill search_keywords with every keyword each posting was found under
+        
+        Streams the CSV into a temp file and renames it over the original, so
+        memory use does not depend on the file size. Does nothing when no
+        posting was merged.
+        
+        Returns:
+            Number of rows whose search_keywords changed
+        """
+        if self._log_handle is not None:
+            self._log_handle.close()
+            self._log_handle = None
+        if not self.merged or not csv_path.exists():
+            return 0
+        
+        changed = 0
+        tmp_path = csv_path.with_name(csv_path.name + '.tmp')
+        with open(csv_path, 'r', newline='', encoding='utf-8-sig') as src, \
+                open(tmp_path, 'w', newline='', encoding='utf-8-sig') as dst:
+            reader = csv.DictReader(src)
+            fieldnames = list(reader.fieldnames or [])
+            if 'search_keywords' not in fieldnames:
+                fieldnames.insert(fieldnames.index('search_keyword') + 1 if 'search_keyword' in fieldnames else 0, 'search_keywords')
+            writer = csv.DictWriter(dst, fieldnames=fieldnames)
+            writer.writeheader()
+            for row in reader:
+                key = _dedup_key(row)
+                mask = self._masks.get(key) if key is not None else None
+                if mask is not None:
+                    merged = KEYWORD_SEPARATOR.join(self.keywords_for(mask))
+                    if merged != row.get('search_keywords'):
+                        row['search_keywords'] = merged
+                        changed += 1
+                writer.writerow(row)
+        os.replace(tmp_path, csv_path)
+        
+        if self.merge_log is not None and self.merge_log.exists():
+            self.merge_log.unlink()
+        return changed
+
+
+async def scrape_nz_jobs(
+    max_per_keyword: int = 10,
+    headless: bool = False,
+    browser: str = "firefox",
+    output_csv: str = None,
+    concurrency: int = 3,
+    rps: float = 1.0,
+    burst: int = 3,
+    backoff: float = 0.5,
+    extraction: str = "bulk",
+    save_html: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    resume: bool = False,
+    incremental: bool = False,
+    checkpoint_path: str = DEFAULT_CHECKPOINT,
+    job_index_path: str = DEFAULT_JOB_INDEX,
+    dedup_max_entries: int = 500_000,
+    lean: bool = True,
+    keywords: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Scrape IT jobs from New Zealand Seek and save to CSV file
     
+    One browser is launched for the whole run and keywords are scraped
+    concurrently on a pool of pages, at most ``concurrency`` at a time. Each
+    keyword follows result pages until ``max_per_keyword`` jobs are found.
+    
+    Progress is checkpointed after every results page and every written
+    job ID is added to a persistent index. A posting found under several
+    keywords is written once; search_keywords lists all of its keywords.
+    
     Args:
         max_per_keyword: Maximum number of jobs to scrape per keyword (default: 10)
         headless: Whether to use headless mode
         browser: Browser to use (chromium, firefox, webkit)
-        output_csv: Output CSV file path (default: nz_jobs_YYYYMMDD_HHMMSS.csv)
+        output_csv: Output CSV file path (default: nz_jobs_YYYYMMDD_HHMMSS.csv, or the checkpoint's file when resuming)
+        concurrency: Number of keywords scraped at the same time (default: 3)
+        rps: Maximum page loads per second across all workers (default: 1)
+        burst: Page loads allowed back to back before rps applies (default: 3)
+        backoff: Rate multiplier applied when the site throttles or slows down (default: 0.5)
+        extraction: Card extraction path (bulk, per-element, html)
+        save_html: Directory to save every fetched results page to (default: don't save)
+        max_pages: Maximum number of results pages per keyword (default: no limit)
+        resume: Continue the run recorded in the checkpoint, appending to its output file
+        incremental: Skip jobs whose ID is already in the job index
+        checkpoint_path: Checkpoint file path (default: scrape_checkpoint.json)
+        job_index_path: Job ID index file path (default: scrape_job_ids.txt)
+        dedup_max_entries: Maximum number of postings kept in the cross-keyword dedup index
+        lean: Block non-essential resources and wait only for job cards (default: True)
+        keywords: Keywords to scrape (default: NZ_IT_KEYWORDS)
+    
+    Returns:
+        Run summary with output path, rows written, pages loaded and elapsed seconds
     """
+    _require_playwright()
+    
+    if keywords is None:
+        keywords = NZ_IT_KEYWORDS
+    
+    base_dir = Path(__file__).parent
+    checkpoint_file = base_dir / checkpoint_path
+    checkpoint = ScrapeCheckpoint.load(checkpoint_file) if resume else None
+    if resume and checkpoint is None:
+        print(f"⚠ No checkpoint found at {checkpoint_file}, starting a new run")
+    
+    # Generate timestamped filename if output file not specified
+    if output_csv is None:
+        if checkpoint is not None and checkpoint.output:
+            output_csv = checkpoint.output
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_csv = f"nz_jobs_{timestamp}.csv"
+    
+    output_path = base_dir / output_csv
+    if checkpoint is None or checkpoint.output != output_csv:
+        checkpoint = ScrapeCheckpoint(checkpoint_file, output_csv)
+        resume = False
+    
+    job_index = JobIdIndex(base_dir / job_index_path)
+    # Postings already in a resumed run's output are merged, never written twice
+    dedup = JobDeduplicator(dedup_max_entries, merge_log=output_path.with_name(output_path.name + '.merges'))
+    if resume:
+        dedup.load_csv(output_path)
+    elif dedup.merge_log.exists():
+        dedup.merge_log.unlink()
+    
+    pending_keywords = [
+        keyword for keyword in keywords
+        if not checkpoint.keyword_state(keyword)['completed']
+    ]
+    
     print("="*60)
     print("Starting to scrape IT job data from New Zealand Seek")
-    print(f"Number of keywords: {len(NZ_IT_KEYWORDS)}")
+    print(f"Number of keywords: {len(pending_keywords)} of {len(keywords)}")
     print(f"Max jobs per keyword: {max_per_keyword}")
-    print(f"Estimated total jobs: {len(NZ_IT_KEYWORDS) * max_per_keyword}")
+    print(f"Estimated total jobs: {len(pending_keywords) * max_per_keyword}")
+    print(f"Concurrency: {concurrency} (rate limit {rps}/s, burst {burst})")
+    if resume:
+        print(f"Resuming run: {output_csv} ({len(dedup)} jobs already saved)")
+    if incremental:
+        print(f"Incremental mode: {len(job_index)} known job IDs will be skipped")
     print("="*60)
     
-    # Generate timestamped filename if output file not specified
+    # Rows are appended to the CSV as they are scraped, not buffered
+    writer = JobCsvWriter(output_path, append=resume)
+    skipped = 0
+    duplicates = 0
+    timings = PageTimings()
+    rate_limiter = AdaptiveRateLimiter(rate=rps, burst=burst, backoff=backoff)
+    started = time.perf_counter()
+    
+    async def _scrape_keyword(i: int, keyword: str, pool: PagePool):
+        nonlocal skipped, duplicates
+        state = checkpoint.keyword_state(keyword)
+        page_jobs = 0
+        
+        def _page_done(page_number: int):
+            nonlocal page_jobs
+            # Rows must be on disk before the checkpoint says the page is done
+            writer.flush()
+            job_index.flush()
+            dedup.flush()
+            checkpoint.mark_page(keyword, page_number, page_jobs)
+            page_jobs = 0
+        
+        async with pool.page() as page:
+            print(f"\n[{i}/{len(pending_keywords)}] Processing keyword: {keyword}")
+            
+            keyword_count = 0
+            keyword_scraped = 0
+            keyword_merged = 0
+            keyword_known = 0
+            try:
+                # Consume the stream so each job is handled as soon as it is parsed
+                async for job in iter_seek_jobs(
+                    page,
+                    keyword,
+                    max_results=max(0, max_per_keyword - state['jobs']),
+                    max_pages=max_pages,
+                    country='nz',  # New Zealand
+                    extraction=extraction,
+                    save_html_dir=Path(save_html) if save_html else None,
+                    rate_limiter=rate_limiter,
+                    start_page=state['pages_done'] + 1,
+                    on_page_done=_page_done,
+                    lean=lean,
+                    timings=timings
+                ):
+                    keyword_scraped += 1
+                    job_id = job.get('job_id', '')
+                    if incremental and job_id and job_id in job_index:
+                        skipped += 1
+                        keyword_known += 1
+                        continue
+                    if not dedup.add(job, keyword):
+                        duplicates += 1
+                        keyword_merged += 1
+                        continue
+                    
+                    # Ensure each job has search_keyword field
+                    job['search_keyword'] = keyword
+                    job['search_keywords'] = keyword
+                    writer.write(job)
+                    job_index.add(job_id)
+                    keyword_count += 1
+                    page_jobs += 1
+                
+                writer.flush()
+                checkpoint.mark_completed(keyword)
+                # Warn on what the search returned, not on what was new
+                if keyword_scraped:
+                    details = [f"got {keyword_count} jobs"]
+                    if keyword_merged:
+                        details.append(f"{keyword_merged} merged into jobs from earlier keywords")
+                    if keyword_known:
+                        details.append(f"{keyword_known} already in the output")
+                    print(f"✓ Completed keyword: {keyword} ({', '.join(details)})")
+                else:
+                    print(f"⚠ Keyword: {keyword} returned no data")
+                    
+            except Exception as e:
+                print(f"✗ Failed to process keyword: {keyword} - {e}")
+                import traceback
+                traceback.print_exc()
+    
+    checkpoint.save()
+    try:
+        if pending_keywords:
+            async with async_playwright() as p:
+                browser_instance = await _launch_browser(p, browser, headless)
+                pool = await PagePool(
+                    browser_instance,
+                    min(concurrency, len(pending_keywords)),
+                    lean=lean,
+                    timings=timings
+                ).start()
+                try:
+                    await asyncio.gather(*(
+                        _scrape_keyword(i, keyword, pool)
+                        for i, keyword in enumerate(pending_keywords, 1)
+                    ))
+                finally:
+                    await pool.close()
+                    await browser_instance.close()
+    except Exception as e:
+        print(f"✗ Browser session failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        writer.close()
+        job_index.close()
+    
+    merged_rows = dedup.rewrite_keywords(output_path)
+    elapsed = time.perf_counter() - started
+    
+    if timings.pages:
+        print(f"\nPage timings ({'lean' if lean else 'networkidle + 2s wait'}):")
+        for line in timings.summary_lines():
+            print(line)
+        print(f"Rate limiter: {rate_limiter.summary()}")
+    
+    if writer.rows_written or resume:
+        print(f"\n{'='*60}")
+        print(f"Data saved successfully!")
+        print(f"File path: {output_path}")
+        print(f"Total jobs scraped: {writer.rows_written}")
+        if duplicates:
+            print(f"Cross-keyword duplicates merged: {duplicates} (into {merged_rows} rows)")
+        if skipped:
+            print(f"Known jobs skipped: {skipped}")
+        print(f"Elapsed time: {elapsed:.1f}s")
+        print(f"{'='*60}")
+    else:
+        print(f"\n{'='*60}")
+        print("⚠ Warning: No job data was scraped")
+        if skipped:
+            print(f"Known jobs skipped: {skipped}")
+        print(f"{'='*60}")
+    
+    return {
+        'output': str(output_path),
+        'rows': writer.rows_written,
+        'pages': timings.pages,
+        'keywords': len(pending_keywords),
+        'elapsed': elapsed,
+    }
+
+
+def _shard_path(path: str, shard: int) -> str:
+    """nz_jobs.csv -> nz_jobs.shard0.csv"""
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}.shard{shard}{p.suffix}"))
+
+
+def _sharded_resume_output(checkpoint_path: str, workers: int) -> Optional[str]:
+    """
+    Merged output name of the interrupted sharded run, from its shard checkpoints
+    
+    Shard checkpoints record nz_jobs_X.shardN.csv; the merged name is
+    nz_jobs_X.csv. Returns None when no shard checkpoint exists.
+    """
+    base_dir = Path(__file__).parent
+    for shard in range(workers):
+        checkpoint = ScrapeCheckpoint.load(base_dir / _shard_path(checkpoint_path, shard))
+        if checkpoint is None or not checkpoint.output:
+            continue
+        shard_output = Path(checkpoint.output)
+        marker = f".shard{shard}"
+        if shard_output.stem.endswith(marker):
+            return str(shard_output.with_name(shard_output.stem[:-len(marker)] + shard_output.suffix))
+    return None
+
+
+def _run_shard(shard: int, keywords: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Scrape one keyword shard in its own process, with its own browser
+
+    Top-level so it can run in a process pool.
+    """
+    summary = asyncio.run(scrape_nz_jobs(keywords=keywords, **options))
+    summary['shard'] = shard
+    return summary
+
+
+def merge_job_csvs(input_paths: List[Path], output_path: Path, dedup_max_entries: int = 500_000) -> int:
+    """
+    Stream several job CSVs into one, merging postings found in more than one
+
+    Args:
+        input_paths: CSV files written by JobCsvWriter
+        output_path: Merged CSV file path
+        dedup_max_entries: Maximum number of postings kept in the dedup index
+
+    Returns:
+        Number of rows written
+    """
+    dedup = JobDeduplicator(dedup_max_entries)
+    with JobCsvWriter(output_path) as writer:
+        for path in input_paths:
+            if not path.exists():
+                continue
+            with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+                for row in csv.DictReader(f):
+                    row_keywords = (row.get('search_keywords') or row.get('search_keyword') or '').split(KEYWORD_SEPARATOR)
+                    row_keywords = [keyword for keyword in row_keywords if keyword] or ['']
+                    if dedup.add(row, row_keywords[0]):
+                        writer.write(row)
+                    for keyword in row_keywords[1:]:
+                        dedup.add(row, keyword)
+        rows = writer.rows_written
+    dedup.rewrite_keywords(output_path)
+    return rows
+
+
+def scrape_nz_jobs_sharded(workers: int, output_csv: str = None, checkpoint_path: str = DEFAULT_CHECKPOINT, **options) -> Dict[str, Any]:
+    """
+    Scrape with one process (and one browser) per keyword shard, then merge
+
+    Keywords are dealt round-robin across ``workers`` shards. Each shard
+    writes its own CSV and checkpoint, so --resume works per shard as long
+    as the same number of workers is used. The rate limit is split evenly
+    between shards to keep the overall request rate unchanged.
+
+    Args:
+        workers: Number of processes
+        output_csv: Merged output CSV path (default: nz_jobs_YYYYMMDD_HHMMSS.csv)
+        checkpoint_path: Base checkpoint path; shards use <stem>.shardN.json
+        **options: Passed through to scrape_nz_jobs
+
+    Returns:
+        Run summary with merged output path, rows written, elapsed seconds and per-shard summaries
+    """
+    keywords = options.pop('keywords', None) or NZ_IT_KEYWORDS
+    workers = max(1, min(workers, len(keywords)))
+    shards = [keywords[i::workers] for i in range(workers)]
+    
+    if output_csv is None and options.get('resume'):
+        output_csv = _sharded_resume_output(checkpoint_path, workers)
+        if output_csv is None:
+            print(f"⚠ No shard checkpoints found for {checkpoint_path}, starting a new run")
     if output_csv is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_csv = f"nz_jobs_{timestamp}.csv"
     
+    # Split the rate limit so all shards together stay within it. Each shard
+    # needs at least one token, so the combined burst is at least `workers`.
+    options['rps'] = options.get('rps', 1.0) / workers
+    options['burst'] = max(1, options.get('burst', 3) // workers)
+    
+    print("="*60)
+    print(f"Sharded scrape: {len(keywords)} keywords across {workers} processes")
+    print("="*60)
+    
+    started = time.perf_counter()
+    summaries: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _run_shard,
+                shard,
+                shard_keywords,
+                dict(options, output_csv=_shard_path(output_csv, shard), checkpoint_path=_shard_path(checkpoint_path, shard))
+            )
+            for shard, shard_keywords in enumerate(shards)
+        ]
+        for future in futures:
+            try:
+                summaries.append(future.result())
+            except Exception as e:
+                print(f"✗ Shard failed: {e}")
+    scraped = time.perf_counter() - started
+    
     output_path = Path(__file__).parent / output_csv
+    shard_paths = [Path(summary['output']) for summary in summaries]
+    rows = merge_job_csvs(shard_paths, output_path, options.get('dedup_max_entries', 500_000))
+    elapsed = time.perf_counter() - started
     
-    # Store all job data
-    all_jobs: List[Dict[str, Any]] = []
-    total_success = 0
+    print(f"\n{'='*60}")
+    print("Per-shard timing:")
+    for summary in sorted(summaries, key=lambda item: item['shard']):
+        rate = summary['pages'] / summary['elapsed'] if summary['elapsed'] else 0.0
+        print(
+            f"  shard {summary['shard']}: {summary['keywords']} keywords, {summary['pages']} pages, "
+            f"{summary['rows']} rows in {summary['elapsed']:.1f}s ({rate:.2f} pages/s)"
+        )
+    print(f"Scraping wall time: {scraped:.1f}s, merge: {elapsed - scraped:.1f}s")
+    print(f"Merged file: {output_path} ({rows} rows)")
+    print(f"{'='*60}")
     
-    for i, keyword in enumerate(NZ_IT_KEYWORDS, 1):
-        print(f"\n{'='*60}")
-        print(f"Processing keyword {i}/{len(NZ_IT_KEYWORDS)}: {keyword}")
-        print(f"{'='*60}")
+    # Shard files are only removed once every shard finished and merged
+    if len(summaries) == len(shards):
+        for path in shard_paths:
+            path.unlink(missing_ok=True)
+        for shard in range(len(shards)):
+            (Path(__file__).parent / _shard_path(checkpoint_path, shard)).unlink(missing_ok=True)
+    
+    return {'output': str(output_path), 'rows': rows, 'elapsed': elapsed, 'shards': summaries}
+
+
+# Job detail page fields: name -> selector fallback chain
+DETAIL_FIELD_SELECTORS: Dict[str, List[str]] = {
+    'full_description': [
+        '[data-automation="jobAdDetails"]',
+        '[data-automation="jobDescription"]',
+    ],
+    'classification': [
+        '[data-automation="job-detail-classifications"]',
+        '[data-automation="jobClassification"]',
+    ],
+    'detail_work_type': [
+        '[data-automation="job-detail-work-type"]',
+    ],
+    'detail_posted': [
+        '[data-automation="job-detail-date"]',
+    ],
+}
+
+DETAIL_FIELDS = ['job_id', 'url', 'full_description', 'posted_at', 'classification', 'detail_work_type', 'detail_posted']
+DEFAULT_DETAILS_CACHE = "job_details_cache"
+
+# Runs in the page: reads every detail field in one round trip, plus the
+# posting timestamp from the JSON-LD JobPosting block when there is one
+_EXTRACT_DETAIL_JS = """
+(fieldSelectors) => {
+    const record = {};
+    for (const [field, selectors] of Object.entries(fieldSelectors)) {
+        let elem = null;
+        for (const selector of selectors) {
+            elem = document.querySelector(selector);
+            if (elem) break;
+        }
+        record[field] = elem ? elem.innerText.trim() : '';
+    }
+    record.posted_at = '';
+    for (const script of document.querySelectorAll('script[type="application/ld+json"]')) {
+        try {
+            const data = JSON.parse(script.textContent);
+            const items = Array.isArray(data) ? data : [data];
+            for (const item of items) {
+                if (item && item.datePosted) {
+                    record.posted_at = item.datePosted;
+                }
+            }
+        } catch (e) {}
+    }
+    return record;
+}
+"""
+
+
+async def fetch_job_detail(page: Page, url: str, lean: bool = True, timings: Optional[PageTimings] = None) -> Tuple[Optional[int], Dict[str, str]]:
+    """
+    Load a job's detail page and read its full ad text, timestamp and classification
+
+    Args:
+        page: Page to load the detail page on
+        url: Job URL from the search card
+        lean: Wait for the ad body instead of networkidle + fixed wait
+        timings: Records navigate/ready/extract durations when given
+
+    Returns:
+        Tuple of (HTTP status or None, detail fields)
+    """
+    started = time.perf_counter()
+    if lean:
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        navigated = time.perf_counter()
+        try:
+            ready_selector = ', '.join(DETAIL_FIELD_SELECTORS['full_description'])
+            await page.wait_for_selector(ready_selector, state="attached", timeout=READY_TIMEOUT_MS)
+        except Exception:
+            pass
+    else:
+        response = await page.goto(url, wait_until="networkidle", timeout=30000)
+        navigated = time.perf_counter()
+        await page.wait_for_timeout(2000)
+    ready = time.perf_counter()
+    
+    record = await page.evaluate(_EXTRACT_DETAIL_JS, DETAIL_FIELD_SELECTORS)
+    if timings is not None:
+        timings.add('navigate', navigated - started)
+        timings.add('ready', ready - navigated)
+        timings.add('extract', time.perf_counter() - ready)
+    return (response.status if response is not None else None), record
+
+
+class DetailCache:
+    """Detail page fields cached on disk as one JSON file per job_id"""
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, job_id: str) -> Path:
+        return self.cache_dir / f"{re.sub(r'[^0-9A-Za-z_-]', '_', job_id)}.json"
+    
+    def get(self, job_id: str) -> Optional[Dict[str, str]]:
+        path = self._path(job_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def put(self, job_id: str, record: Dict[str, str]):
+        path = self._path(job_id)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def _details_path(output_csv: str) -> str:
+    """nz_jobs.csv -> nz_jobs_details.csv"""
+    p = Path(output_csv)
+    return str(p.with_name(f"{p.stem}_details{p.suffix}"))
+
+
+async def enrich_job_details(
+    input_csv: str,
+    output_csv: str = None,
+    concurrency: int = 4,
+    cache_dir: str = DEFAULT_DETAILS_CACHE,
+    headless: bool = False,
+    browser: str = "firefox",
+    rps: float = 1.0,
+    burst: int = 3,
+    backoff: float = 0.5,
+    lean: bool = True,
+    report_every: float = 5.0
+) -> Dict[str, Any]:
+    """
+    Fetch each job's detail page and write the enriched fields to a CSV
+    
+    Job IDs and URLs are streamed from ``input_csv`` into a bounded queue
+    that ``concurrency`` page workers drain through the shared rate limiter.
+    Jobs whose details are already cached on disk are written straight from
+    the cache. Rows are written as soon as they are ready, keyed by job_id.
+    Throughput and queue depth are printed every ``report_every`` seconds.
+    
+    Args:
+        input_csv: Scraped jobs CSV (needs job_id and url columns)
+        output_csv: Details CSV path (default: <input>_details.csv)
+        concurrency: Number of detail pages fetched at the same time (default: 4)
+        cache_dir: Directory of cached detail records (default: job_details_cache)
+        headless: Whether to use headless mode
+        browser: Browser to use (chromium, firefox, webkit)
+        rps: Maximum detail page loads per second (default: 1)
+        burst: Page loads allowed back to back before rps applies (default: 3)
+        backoff: Rate multiplier applied when the site throttles or slows down (default: 0.5)
+        lean: Block non-essential resources and wait only for the ad body (default: True)
+        report_every: Seconds between progress reports
+    
+    Returns:
+        Summary with output path and fetched/cached/failed counts
+    """
+    _require_playwright()
+    
+    base_dir = Path(__file__).parent
+    input_path = base_dir / input_csv
+    output_path = base_dir / (output_csv or _details_path(input_csv))
+    cache = DetailCache(base_dir / cache_dir)
+    rate_limiter = AdaptiveRateLimiter(rate=rps, burst=burst, backoff=backoff)
+    timings = PageTimings()
+    queue: "asyncio.Queue[Optional[Tuple[str, str]]]" = asyncio.Queue(maxsize=max(1, concurrency) * 4)
+    counts = {'queued': 0, 'fetched': 0, 'cached': 0, 'failed': 0}
+    started = time.perf_counter()
+    
+    print("="*60)
+    print("Fetching job detail pages")
+    print(f"Input: {input_path}")
+    print(f"Concurrency: {concurrency} (rate limit {rps}/s)")
+    print("="*60)
+    
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as out:
+        writer = csv.DictWriter(out, fieldnames=DETAIL_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        
+        def _write(job_id: str, url: str, record: Dict[str, str]):
+            writer.writerow(dict(record, job_id=job_id, url=url))
+            out.flush()
+        
+        async def _produce():
+            seen: Set[str] = set()
+            with open(input_path, 'r', newline='', encoding='utf-8-sig') as f:
+                for row in csv.DictReader(f):
+                    job_id = (row.get('job_id') or '').strip()
+                    url = (row.get('url') or '').strip()
+                    if not job_id or not url or job_id in seen:
+                        continue
+                    seen.add(job_id)
+                    cached = cache.get(job_id)
+                    if cached is not None:
+                        _write(job_id, url, cached)
+                        counts['cached'] += 1
+                        continue
+                    counts['queued'] += 1
+                    await queue.put((job_id, url))
+            for _ in range(concurrency):
+                await queue.put(None)
+        
+        async def _work(pool: PagePool):
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                job_id, url = item
+                async with pool.page() as page:
+                    for attempt in range(3):
+                        await rate_limiter.acquire()
+                        load_started = time.perf_counter()
+                        try:
+                            status, record = await fetch_job_detail(page, url, lean, timings)
+                        except Exception as e:
+                            rate_limiter.record(time.perf_counter() - load_started, failed=True)
+                            print(f"    Warning: Failed to fetch details for {job_id}: {e}")
+                            counts['failed'] += 1
+                            break
+                        if status in AdaptiveRateLimiter.THROTTLE_STATUSES:
+                            rate_limiter.record(time.perf_counter() - load_started, status)
+                            continue
+                        has_body = 1 if record.get('full_description') else 0
+                        rate_limiter.record(time.perf_counter() - load_started, status, has_body)
+                        if has_body:
+                            cache.put(job_id, record)
+                        _write(job_id, url, record)
+                        counts['fetched'] += 1
+                        break
+                    else:
+                        counts['failed'] += 1
+        
+        async def _report():
+            while True:
+                await asyncio.sleep(report_every)
+                elapsed = time.perf_counter() - started
+                done = counts['fetched'] + counts['failed']
+                print(
+                    f"  [details] {done}/{counts['queued']} fetched, {counts['cached']} from cache, "
+                    f"{counts['failed']} failed, queue depth {queue.qsize()}, "
+                    f"{counts['fetched'] / elapsed:.2f} pages/s"
+                )
         
+        reporter = asyncio.create_task(_report())
         try:
-            # Call scraping function and get returned data
-            jobs_data = await scrape_seek_search(
-                keywords=keyword,
-                max_results=max_per_keyword,
-                headless=headless,
-                browser_name=browser,
-                country='nz'  # New Zealand
-            )
-            
-            # Process returned data
-            if jobs_data:
-                # If returned data is a list
-                if isinstance(jobs_data, list):
-                    for job in jobs_data:
-                        # Ensure each job has search_keyword field
-                        if isinstance(job, dict):
-                            job['search_keyword'] = keyword
-                            all_jobs.append(job)
-                        else:
-                            # If not a dict, try to convert
-                            all_jobs.append({
-                                'search_keyword': keyword,
-                                'title': str(job) if job else '',
-                                'raw_data': str(job)
-                            })
-                # If returned data is a dict (single job)
-                elif isinstance(jobs_data, dict):
-                    jobs_data['search_keyword'] = keyword
-                    all_jobs.append(jobs_data)
-                
-                keyword_count = len(jobs_data) if isinstance(jobs_data, list) else 1
-                print(f"✓ Completed keyword: {keyword} (got {keyword_count} jobs)")
-                total_success += keyword_count
-            else:
-                print(f"⚠ Keyword: {keyword} returned no data")
-                
+            async with async_playwright() as p:
+                browser_instance = await _launch_browser(p, browser, headless)
+                pool = await PagePool(browser_instance, concurrency, lean=lean, timings=timings).start()
+                try:
+                    await asyncio.gather(_produce(), *(_work(pool) for _ in range(concurrency)))
+                finally:
+                    await pool.close()
+                    await browser_instance.close()
         except Exception as e:
-            print(f"✗ Failed to process keyword: {keyword} - {e}")
+            print(f"✗ Detail fetching failed: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            reporter.cancel()
+    
+    elapsed = time.perf_counter() - started
+    print(f"\n{'='*60}")
+    print(f"Details saved: {output_path}")
+    print(f"Fetched: {counts['fetched']}, from cache: {counts['cached']}, failed: {counts['failed']}")
+    print(f"Elapsed time: {elapsed:.1f}s ({counts['fetched'] / elapsed if elapsed else 0:.2f} pages/s)")
+    if timings.pages:
+        for line in timings.summary_lines():
+            print(line)
+    print(f"{'='*60}")
+    return dict(counts, output=str(output_path), elapsed=elapsed)
+
+
+# Fixed CSV schema (geographic fields prioritized)
+STANDARD_FIELDS = [
+    'search_keyword',  # Search keyword (first keyword the job was found under)
+    'search_keywords', # Every keyword the job was found under, '|'-separated
+    'title',           # Job title
+    'company',         # Company name
+    'location',        # Location
+    'city',            # City
+    'region',          # Region
+    'area',            # Area
+    'salary',          # Salary
+    'salary_min',      # Minimum salary
+    'salary_max',      # Maximum salary
+    'description',     # Job description
+    'url',             # Job URL
+    'job_id',          # Job ID
+    'posted_date',     # Posted date
+    'work_type',       # Work type
+    'job_type',        # Job type
+]
+
+# Side column holding any keys outside STANDARD_FIELDS, as a JSON object
+EXTRA_FIELD = 'extra'
+
+
+def _job_row(job: Dict[str, Any], fieldnames: List[str]) -> Dict[str, Any]:
+    """
+    Flatten a job dict into one output row
+    
+    None becomes an empty string, and keys outside ``fieldnames`` are folded
+    into EXTRA_FIELD as a JSON object. An EXTRA_FIELD value already present
+    (a row read back from a CSV this writer produced) is merged with those
+    keys rather than nested inside them.
+    """
+    row = {}
+    extra = {}
+    existing = job.get(EXTRA_FIELD)
+    if isinstance(existing, str) and existing:
+        try:
+            existing = json.loads(existing)
+        except json.JSONDecodeError:
+            pass
+    if isinstance(existing, dict):
+        extra.update(existing)
+    elif existing:
+        # Not a JSON object: keep it as written
+        row[EXTRA_FIELD] = existing
+    for key, value in job.items():
+        if key == EXTRA_FIELD:
+            continue
+        if value is None:
+            value = ''
+        if key in fieldnames:
+            row[key] = str(value) if isinstance(value, (list, dict)) else value
+        else:
+            extra[key] = value
+    if extra:
+        row[EXTRA_FIELD] = json.dumps(extra, ensure_ascii=False, sort_keys=True, default=str)
+    return row
+
+
+class JobCsvWriter:
+    """
+    Append job rows to a CSV file as they arrive
+    
+    The header is fixed (STANDARD_FIELDS plus EXTRA_FIELD), so rows can be
+    written one at a time without first collecting every field name. The
+    file is opened on the first write and flushed every ``flush_every`` rows,
+    so a crash only loses the rows since the last flush.
+    
+    When appending, the existing file's header is kept and keys outside it
+    go to EXTRA_FIELD. A file whose header differs from the current schema
+    and has no EXTRA_FIELD column cannot hold those keys, so appending to it
+    raises ValueError instead of dropping them.
+    """
+    
+    def __init__(self, output_path: Path, append: bool = False, flush_every: int = 20):
+        self.output_path = Path(output_path)
+        self.append = append
+        self.flush_every = max(1, flush_every)
+        self.fieldnames = STANDARD_FIELDS + [EXTRA_FIELD]
+        self.rows_written = 0
+        self._handle = None
+        self._writer = None
+        self._pending = 0
+        self._resume = (
+            append
+            and self.output_path.exists()
+            and self.output_path.stat().st_size > 0
+        )
+        if self._resume:
+            # Keep the column order of the file we are appending to
+            with open(self.output_path, 'r', newline='', encoding='utf-8-sig') as existing:
+                header = next(csv.reader(existing), None)
+            if header:
+                if header != self.fieldnames and EXTRA_FIELD not in header:
+                    raise ValueError(
+                        f"Cannot resume into {self.output_path.name}: its header predates the "
+                        f"'{EXTRA_FIELD}' column, so fields outside it would be lost. "
+                        f"Start a new output file instead."
+                    )
+                self.fieldnames = header
+    
+    def _open(self):
+        resume = self._resume
+        self._handle = open(
+            self.output_path,
+            'a' if resume else 'w',
+            newline='',
+            encoding='utf-8-sig'
+        )
+        self._writer = csv.DictWriter(self._handle, fieldnames=self.fieldnames, extrasaction='ignore')
+        if not resume:
+            self._writer.writeheader()
+    
+    def write(self, job: Dict[str, Any]):
+        """Write one job row"""
+        if self._writer is None:
+            self._open()
         
-        # Wait between keywords to avoid too many requests
-        if i < len(NZ_IT_KEYWORDS):
-            print(f"\nWaiting 5 seconds before next keyword...")
-            await asyncio.sleep(5)
-    
-    # Save data to CSV
-    if all_jobs:
-        _save_jobs_to_csv(all_jobs, output_path)
-        print(f"\n{'='*60}")
-        print(f"Data saved successfully!")
-        print(f"File path: {output_path}")
-        print(f"Total jobs scraped: {len(all_jobs)}")
-        print(f"Successfully processed: {total_success} jobs")
-        print(f"{'='*60}")
-    else:
-        print(f"\n{'='*60}")
-        print("⚠ Warning: No job data was scraped")
-        print(f"{'='*60}")
+        self._writer.writerow(_job_row(job, self.fieldnames))
+        
+        self.rows_written += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+    
+    def write_many(self, jobs: List[Dict[str, Any]]):
+        for job in jobs:
+            if isinstance(job, dict):
+                self.write(job)
+    
+    def flush(self):
+        """Push buffered rows to disk"""
+        if self._handle is not None:
+            self._handle.flush()
+        self._pending = 0
+    
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._writer = None
+    
+    def __enter__(self) -> "JobCsvWriter":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
 
 
 def _save_jobs_to_csv(jobs: List[Dict[str, Any]], output_path: Path):
     """
     Save job data to CSV file
     
+    A .parquet/.feather path writes a typed columnar file with the same
+    columns instead (see columnar_io).
+    
     Args:
         jobs: List of job data dictionaries
         output_path: Output file path
@@ -393,59 +2264,35 @@ def _save_jobs_to_csv(jobs: List[Dict[str, Any]], output_path: Path):
         print("Warning: No data to save")
         return
     
-    # Collect all possible field names
-    fieldnames = set()
-    for job in jobs:
-        if isinstance(job, dict):
-            fieldnames.update(job.keys())
-    
-    # Define standard field order (geographic fields prioritized)
-    standard_fields = [
-        'search_keyword',  # Search keyword
-        'title',           # Job title
-        'company',         # Company name
-        'location',        # Location
-        'city',            # City
-        'region',          # Region
-        'area',            # Area
-        'salary',          # Salary
-        'salary_min',      # Minimum salary
-        'salary_max',      # Maximum salary
-        'description',     # Job description
-        'url',             # Job URL
-        'job_id',          # Job ID
-        'posted_date',     # Posted date
-        'work_type',       # Work type
-        'job_type',        # Job type
-    ]
+    # columnar_io loads pandas/pyarrow only when a columnar file is written
+    from columnar_io import is_columnar, write_frame
+    if is_columnar(output_path):
+        import pandas as pd
+        
+        fieldnames = STANDARD_FIELDS + [EXTRA_FIELD]
+        rows = [_job_row(job, fieldnames) for job in jobs if isinstance(job, dict)]
+        write_frame(pd.DataFrame(rows, columns=fieldnames), output_path)
+        return
     
-    # Merge standard fields with other fields
-    ordered_fields = []
-    for field in standard_fields:
-        if field in fieldnames:
-            ordered_fields.append(field)
-            fieldnames.remove(field)
+    with JobCsvWriter(output_path) as writer:
+        writer.write_many(jobs)
+
+
+def _export_columnar(csv_path: Path, output_path: Path):
+    """
+    Convert a finished scrape CSV to Parquet/Feather
     
-    # Add other unlisted fields
-    ordered_fields.extend(sorted(fieldnames))
+    Scraping always streams to CSV (resume, dedup and detail enrichment work on
+    it); the columnar copy is written once the run is complete.
     
-    # Write to CSV file
-    with open(output_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=ordered_fields, extrasaction='ignore')
-        writer.writeheader()
-        
-        for job in jobs:
-            if isinstance(job, dict):
-                # Clean data: convert None to empty string
-                cleaned_job = {}
-                for key, value in job.items():
-                    if value is None:
-                        cleaned_job[key] = ''
-                    elif isinstance(value, (list, dict)):
-                        cleaned_job[key] = str(value)
-                    else:
-                        cleaned_job[key] = value
-                writer.writerow(cleaned_job)
+    Args:
+        csv_path: CSV written by the scrape
+        output_path: .parquet or .feather path
+    """
+    from columnar_io import convert
+    
+    rows = convert(csv_path, output_path)
+    print(f"Columnar copy saved: {output_path} ({rows} rows)")
 
 
 def main():
@@ -456,20 +2303,99 @@ def main():
     parser.add_argument('--max-per-keyword', type=int, default=10, help='Maximum number of jobs to scrape per keyword (default: 10)')
     parser.add_argument('--headless', action='store_true', help='Use headless mode (no browser display)')
     parser.add_argument('--browser', type=str, choices=['chromium', 'firefox', 'webkit'], default='firefox', help='Browser engine to use (default: firefox)')
-    parser.add_argument('--output', type=str, default=None, help='Output CSV filename (default: nz_jobs_YYYYMMDD_HHMMSS.csv)')
+    parser.add_argument('--output', type=str, default=None, help='Output CSV filename (default: nz_jobs_YYYYMMDD_HHMMSS.csv); a .parquet/.feather name also writes a typed columnar copy')
+    parser.add_argument('--concurrency', type=int, default=3, help='Number of keywords to scrape at the same time (default: 3)')
+    parser.add_argument('--workers', type=int, default=1, help='Processes to shard keywords across, each with its own browser (default: 1)')
+    parser.add_argument('--rps', type=float, default=1.0, help='Maximum page loads per second across all workers (default: 1)')
+    parser.add_argument('--burst', type=int, default=3, help='Page loads allowed back to back before --rps applies (default: 3)')
+    parser.add_argument('--backoff', type=float, default=0.5, help='Rate multiplier applied when the site throttles or slows down (default: 0.5)')
+    parser.add_argument('--max-pages', type=int, default=None, help='Maximum number of result pages per keyword (default: as many as --max-per-keyword needs)')
+    parser.add_argument('--extraction', type=str, choices=sorted(EXTRACTION_METHODS), default='bulk', help='Job card extraction path (default: bulk)')
+    parser.add_argument('--resume', action='store_true', help='Continue the interrupted run recorded in the checkpoint file')
+    parser.add_argument('--incremental', action='store_true', help='Skip jobs whose IDs were already saved by earlier runs')
+    parser.add_argument('--checkpoint', type=str, default=DEFAULT_CHECKPOINT, help=f'Checkpoint file (default: {DEFAULT_CHECKPOINT})')
+    parser.add_argument('--job-index', type=str, default=DEFAULT_JOB_INDEX, help=f'Known job ID index file (default: {DEFAULT_JOB_INDEX})')
+    parser.add_argument('--dedup-max-entries', type=int, default=500_000, help='Maximum postings kept in the cross-keyword dedup index (default: 500000)')
+    parser.add_argument('--no-lean', action='store_true', help='Load every resource and wait for networkidle + 2s instead of only the job cards')
+    parser.add_argument('--details', action='store_true', help='After scraping, fetch each job detail page into <output>_details.csv')
+    parser.add_argument('--details-from', type=str, default=None, help='Only fetch detail pages for the jobs in this CSV')
+    parser.add_argument('--details-concurrency', type=int, default=4, help='Detail pages fetched at the same time (default: 4)')
+    parser.add_argument('--details-cache', type=str, default=DEFAULT_DETAILS_CACHE, help=f'Directory of cached detail pages (default: {DEFAULT_DETAILS_CACHE})')
+    parser.add_argument('--save-html', type=str, default=None, help='Directory to save fetched search result pages to for offline re-parsing')
+    parser.add_argument('--from-html', type=str, nargs='+', default=None, help='Parse saved search result pages (files, directories or globs) instead of scraping')
+    parser.add_argument('--parse-workers', type=int, default=None, help='Parser processes for --from-html (default: CPU count)')
     
     args = parser.parse_args()
     
+    columnar_output = None
+    if args.output:
+        from columnar_io import is_columnar
+        if is_columnar(args.output):
+            columnar_output = args.output
+            args.output = str(Path(args.output).with_suffix('.csv'))
+    
+    if args.from_html:
+        rows = parse_saved_pages(
+            args.from_html,
+            output_csv=args.output,
+            max_per_page=None,
+            workers=args.parse_workers
+        )
+        if columnar_output and rows:
+            csv_path = Path(__file__).parent / args.output
+            _export_columnar(csv_path, csv_path.with_suffix(Path(columnar_output).suffix))
+        return
+    
     print("Note: This script will scrape real job data from New Zealand Seek")
     print("Make sure playwright browsers are installed: playwright install")
     print()
     
-    asyncio.run(scrape_nz_jobs(
+    options = dict(
         max_per_keyword=args.max_per_keyword,
         headless=args.headless,
         browser=args.browser,
-        output_csv=args.output
-    ))
+        output_csv=args.output,
+        concurrency=args.concurrency,
+        rps=args.rps,
+        burst=args.burst,
+        backoff=args.backoff,
+        extraction=args.extraction,
+        save_html=args.save_html,
+        max_pages=args.max_pages,
+        resume=args.resume,
+        incremental=args.incremental,
+        checkpoint_path=args.checkpoint,
+        job_index_path=args.job_index,
+        dedup_max_entries=args.dedup_max_entries,
+        lean=not args.no_lean
+    )
+    
+    detail_options = dict(
+        concurrency=args.details_concurrency,
+        cache_dir=args.details_cache,
+        headless=args.headless,
+        browser=args.browser,
+        rps=args.rps,
+        burst=args.burst,
+        backoff=args.backoff,
+        lean=not args.no_lean
+    )
+    
+    if args.details_from:
+        asyncio.run(enrich_job_details(args.details_from, **detail_options))
+        return
+    
+    if args.workers > 1:
+        summary = scrape_nz_jobs_sharded(args.workers, **options)
+    else:
+        summary = asyncio.run(scrape_nz_jobs(**options))
+    
+    if columnar_output and summary['rows']:
+        csv_path = Path(summary['output'])
+        _export_columnar(csv_path, csv_path.with_suffix(Path(columnar_output).suffix))
+    
+    if args.details and summary['rows']:
+        asyncio.run(enrich_job_details(summary['output'], **detail_options))
 
 
 if __name__ == "__main__":